@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+Key = tuple[int, str]
+
+
+class AutologinTokenCache:
+    """Short-lived autologin tokens, fetched in the background and handed out once.
+
+    Tokens are single-use and expire after ~5 minutes server-side, so entries
+    are kept for less than that (`ttl_sec`) and removed when taken. Keys are
+    (website_id, email): the email isn't part of the token request, but each
+    login link is built for one address.
+    """
+
+    def __init__(self, fetch_token: Callable[[int, str], Awaitable[Optional[str]]], ttl_sec: Optional[float] = None):
+        self._fetch_token = fetch_token
+        self.ttl_sec = ttl_sec or float(os.getenv("TENWEB_AUTOLOGIN_TTL_SEC", "240"))
+        self._tokens: dict[Key, tuple[str, float]] = {}
+        self._inflight: dict[Key, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(website_id: int, email: str) -> Key:
+        return int(website_id), email.strip().lower()
+
+    def prefetch(self, website_id: int, website_url: str, email: str) -> None:
+        """Start fetching a token unless a fresh one is cached or already on its way."""
+        key = self._key(website_id, email)
+        cached = self._tokens.get(key)
+        if (cached and cached[1] > time.monotonic()) or key in self._inflight:
+            return
+        self._inflight[key] = asyncio.create_task(self._fetch(key, website_url), name=f"tenweb-autologin-{key[0]}")
+
+    async def _fetch(self, key: Key, website_url: str) -> Optional[str]:
+        try:
+            token = await self._fetch_token(key[0], website_url)
+            if token:
+                self._tokens[key] = (token, time.monotonic() + self.ttl_sec)
+            return token
+        except Exception as e:
+            print(f"[10web.autologin] prefetch failed for website {key[0]}: {e}", flush=True)
+            return None
+        finally:
+            self._inflight.pop(key, None)
+
+    def pop(self, website_id: int, email: str) -> Optional[str]:
+        """Take a cached token without waiting; None if there isn't a fresh one."""
+        entry = self._tokens.pop(self._key(website_id, email), None)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    async def pop_soon(self, website_id: int, email: str, timeout: float) -> Optional[str]:
+        """Like `pop`, but give an in-flight prefetch up to `timeout` seconds to land first."""
+        task = self._inflight.get(self._key(website_id, email))
+        if task is not None:
+            await asyncio.wait({task}, timeout=timeout)
+        return self.pop(website_id, email)
+
+    async def take(self, website_id: int, website_url: str, email: str) -> Optional[str]:
+        """Take a token: cached, else the in-flight prefetch, else a fresh fetch."""
+        token = self.pop(website_id, email)
+        if token:
+            return token
+        key = self._key(website_id, email)
+        task = self._inflight.get(key)
+        if task is not None:
+            await asyncio.shield(task)
+            token = self.pop(website_id, email)
+            if token:
+                return token
+        # Fetched for immediate use, so it bypasses the cache
+        return await self._fetch_token(key[0], website_url)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Optional
+
+# Structured requests other agents can send instead of free text, either as the
+# whole message or in a ```json fenced block:
+#   {"action": "create_ai_website", "business_name": "...", "business_description": "..."}
+#   {"action": "create_ai_websites_batch", "sites": [{...}, ...]}
+# Arguments may also be nested under "args". Anything else goes to the LLM.
+ACTIONS = ("create_ai_website", "create_ai_websites_batch")
+
+_FENCED_JSON_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+
+def parse_structured_request(content: str) -> Optional[tuple[str, dict[str, Any]]]:
+    """Return `(action, args)` for a machine-readable request, or None for free text."""
+    text = (content or "").strip()
+    candidates = [text] if text.startswith("{") else []
+    candidates += _FENCED_JSON_RE.findall(text)
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if not isinstance(data, dict) or data.get("action") not in ACTIONS:
+            continue
+        args = data.get("args")
+        if not isinstance(args, dict):
+            args = {k: v for k, v in data.items() if k != "action"}
+        return data["action"], args
+    return None
+
+
+def render_site_reply(site: dict[str, Any]) -> str:
+    """Reply for a created site: the fields the LLM path reports, plus the same as JSON."""
+    if site["website_url"]:
+        lines = [
+            "Website created via 10Web:",
+            f"- Website URL: {site['website_url']}",
+            f"- Admin URL: {site['admin_url']}",
+        ]
+    else:
+        lines = [
+            "Website created via 10Web and still generating:",
+            f"- Website ID: {site['website_id']} (I'll have the URL once it's ready; ask for its status)",
+        ]
+    lines += [
+        f"- Username: {site['admin_username']}",
+        f"- Password: {site['admin_password']}",
+    ]
+    if site.get("autologin_url"):
+        lines.append(f"- Autologin URL: {site['autologin_url']}")
+    data = {k: site.get(k) for k in (
+        "status", "website_id", "website_url", "admin_url", "admin_username", "admin_password", "autologin_url",
+    )}
+    return "\n".join(lines) + "\n\n```json\n" + json.dumps(data) + "\n```"
+
+
+def render_error_reply(action: str, error: str) -> str:
+    return f"ERROR handling {action}: {error}\n\n```json\n" + json.dumps({"status": "error", "error": error}) + "\n```"
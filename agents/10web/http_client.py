@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+from typing import Any, Optional
+
+import httpx
+
+API_BASE_URL = "https://api.10web.io"
+
+# Statuses worth retrying; 429 is also safe for non-idempotent requests
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client for the 10Web API (HTTP/2 when `h2` is installed)."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            base_url=API_BASE_URL,
+            http2=_http2_available(),
+            timeout=httpx.Timeout(float(os.getenv("TENWEB_HTTP_TIMEOUT_SEC", "30")), connect=10.0),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("TENWEB_HTTP_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=10,
+                keepalive_expiry=60,
+            ),
+        )
+    return _CLIENT
+
+
+async def aclose() -> None:
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+    # Full jitter: uniform(0, base * 2^attempt), capped
+    return random.uniform(0, min(10.0, 0.5 * (2 ** attempt)))
+
+
+async def request(
+    method: str,
+    path: str,
+    api_key: str,
+    *,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request to the 10Web API with retries and raise for HTTP errors.
+
+    Idempotent methods are retried on transport errors and 429/5xx responses.
+    Other methods are retried only when the request can't have been processed:
+    connection failures and 429.
+    """
+    method = method.upper()
+    retries = int(os.getenv("TENWEB_HTTP_RETRIES", "3")) if retries is None else retries
+    idempotent = method in IDEMPOTENT_METHODS
+    headers = {"x-api-key": api_key, **kwargs.pop("headers", {})}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    attempt = 0
+    while True:
+        response: Optional[httpx.Response] = None
+        try:
+            response = await get_client().request(method, path, headers=headers, **kwargs)
+            retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+            if not retryable or attempt >= retries:
+                response.raise_for_status()
+                return response
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+            if attempt >= retries:
+                raise
+        except httpx.TransportError:
+            if not idempotent or attempt >= retries:
+                raise
+        delay = _retry_delay(attempt, response)
+        attempt += 1
+        print(f"[10web.http] {method} {path} retry {attempt}/{retries} in {delay:.2f}s", flush=True)
+        await asyncio.sleep(delay)
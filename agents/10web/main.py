@@ -1,13 +1,22 @@
 import urllib.parse
 from dotenv import load_dotenv
-import os, json, asyncio, traceback, time, random, string
-import requests
-from pydantic import BaseModel, Field
+import os, json, asyncio, random, string
+import httpx
+from pydantic import BaseModel, Field, ValidationError
 from langchain.chat_models import init_chat_model
 from langchain.prompts import ChatPromptTemplate
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain.tools import StructuredTool
+from http_client import request
+from readiness import ReadinessWatcher
+from website_index import WebsiteIndex
+from subdomain_pool import SubdomainPool
+from coral_runtime import PROGRESS_PREFIX, Mention, find_tool
+from mention_loop import executor_handler, llm_coral_tools, run_mention_loop
+from fast_path import parse_structured_request, render_error_reply, render_site_reply
+from results import ToolResult, get_artifact_tool
+from autologin import AutologinTokenCache
 
 
 def get_tools_description(tools):
@@ -17,6 +26,7 @@ def get_tools_description(tools):
     )
 
 async def create_agent(coral_tools, agent_tools):
+    coral_tools = llm_coral_tools(coral_tools)
     coral_tools_description = get_tools_description(coral_tools)
     agent_tools_description = get_tools_description(agent_tools)
     combined_tools = coral_tools + agent_tools
@@ -26,11 +36,11 @@ async def create_agent(coral_tools, agent_tools):
             f"""You are the 10Web agent. You listen for mentions and create AI-powered WordPress websites via your 10Web tools, then report results back clearly with links and credentials.
 
             Use EXACT tool names from the lists below. Follow these steps:
-            1. Call coral_wait_for_mentions (timeoutMs: 60000) to receive instructions. Keep threadId and senderId from the mention event.
+            1. The mention to handle is the user message (threadId, senderId, content). Do not call coral_wait_for_mentions; mentions are collected for you.
             2. If the instruction asks to create a website, extract: business_name, business_description, business_type (optional), region (optional). Defaults: business_type="business", region="us-central1-c".
-            3. Call create_ai_website with those fields. If business_description or business_name is missing, ask a clarifying question via coral_send_message first and wait again.
-            4. Parse the tool result (text may include a trailing raw=JSON) to extract website_url, admin_url, admin_username, admin_password. If website_url is missing but website_id exists, inform the user and include website_id and any error.
-            4.1. If you have an email (from TENWEB_AUTOLOGIN_EMAIL env or by asking the sender), call generate_autologin_url to include a one-click admin login link that does not need a password.
+            3. Call create_ai_website with those fields. If several websites are requested at once, call create_ai_websites_batch once with all of them (pass thread_id=<threadId> and mentions=[<senderId>] so each site is posted as soon as it is ready) instead of calling create_ai_website repeatedly. If business_description or business_name is missing, ask a clarifying question via coral_send_message and stop; the answer arrives as a new mention.
+            4. Read website_url, admin_url, admin_username and admin_password from the tool result fields (full API responses are kept behind artifact handles; only call get_artifact if a detail is missing). If website_url is still generating, tell the sender the site is being built and include website_id; the readiness watch keeps running and get_website_status (website_id) reports the URL later.
+            4.1. If you have an email (from TENWEB_AUTOLOGIN_EMAIL env or by asking the sender), call generate_autologin_url to include a one-click admin login link that does not need a password. Tokens are prefetched as soon as a site is ready, so this is usually instant.
             5. Compose a concise response including these fields explicitly (include autologin if available):
                - Website URL: <website_url>
                - Admin URL: <admin_url>
@@ -39,12 +49,12 @@ async def create_agent(coral_tools, agent_tools):
                - Autologin URL: <autologin_url> (if available)
             6. Use coral_send_message with: threadId=<threadId>, mentions=[<senderId>], content=<your composed response>.
             7. If any error occurs, send a brief error summary with any available details using coral_send_message to the same thread/sender.
-            8. Wait for 2 seconds and repeat from step 1.
 
             Coral tools available: {coral_tools_description}
             Your tools available: {agent_tools_description}
             """
         ),
+        ("human", "{mention}"),
         ("placeholder", "{agent_scratchpad}")
     ])
 
@@ -104,24 +114,63 @@ async def main():
 
     print(f"Coral tools count: {len(coral_tools)} and 10Web tools count: {len(agent_tools)}")
 
+    send_message = find_tool(coral_tools, "send_message")
+    if send_message is None:
+        raise RuntimeError("Coral server did not provide a send_message tool")
+
+    global _CORAL_SEND_MESSAGE
+    _CORAL_SEND_MESSAGE = send_message
+    if _require_api_key():
+        get_subdomain_pool().start()
+
     agent_executor = await create_agent(coral_tools, agent_tools)
 
-    while True:
-        try:
-            print("Starting new agent invocation")
-            await agent_executor.ainvoke({"agent_scratchpad": []})
-            print("Completed agent invocation, restarting loop")
-            await asyncio.sleep(1)
-        except Exception as e:
-            print(f"Error in agent loop: {str(e)}")
-            print(traceback.format_exc())
-            await asyncio.sleep(5)
+    run_agent = executor_handler(agent_executor)
+
+    # Well-formed structured requests are served without a model call
+    async def handle(mention: Mention) -> None:
+        if not await _handle_structured_mention(mention, send_message):
+            await run_agent(mention)
+
+    await run_mention_loop(coral_tools, handle)
+
+
+async def _handle_structured_mention(mention: Mention, send_message) -> bool:
+    """Serve a machine-readable create request directly; False means the LLM should handle it."""
+    request = parse_structured_request(mention.content)
+    if request is None:
+        return False
+    action, args = request
+    try:
+        if action == "create_ai_websites_batch":
+            args = CreateAIWebsitesBatchArgs(**args).model_dump()
+        else:
+            args = CreateAIWebsiteArgs(**args).model_dump()
+    except ValidationError as e:
+        print(f"Structured {action} request is invalid, falling back to the LLM: {e}")
+        return False
+
+    print(f"Handling structured {action} request without the LLM")
+    api_key = _require_api_key()
+    try:
+        if not api_key:
+            raise ValueError("TENWEB_API_KEY not set")
+        if action == "create_ai_websites_batch":
+            args.update(thread_id=mention.thread_id, mentions=[mention.sender_id])
+            reply = await tenweb_create_ai_websites_batch(**args)
+        else:
+            reply = render_site_reply(await _create_website(api_key, **args))
+    except httpx.HTTPStatusError as he:
+        reply = render_error_reply(action, f"HTTP {he.response.status_code}: {he.response.text[:500]}")
+    except Exception as e:
+        reply = render_error_reply(action, str(e))
+    await send_message.ainvoke({"threadId": mention.thread_id, "mentions": [mention.sender_id], "content": reply})
+    return True
 
 # ---------------------
 # 10Web Tools (inline)
 # ---------------------
 
-API_BASE_URL = "https://api.10web.io"
 DEFAULT_REGION = "us-central1-c"
 
 
@@ -168,21 +217,46 @@ class CreateAIWebsiteArgs(BaseModel):
     demo_domain_delete_after_days: int | None = Field(None, description="If demo=1, number of days before deletion (1-30)")
 
 
-def _post_create_ai_website(payload: dict, api_key: str) -> dict:
-    url = f"{API_BASE_URL}/v1/hosting/ai-website"
-    resp = requests.post(url, headers={"x-api-key": api_key, "Content-Type": "application/json"}, data=json.dumps(payload))
-    resp.raise_for_status()
+async def _post_create_ai_website(payload: dict, api_key: str) -> dict:
+    # Site creation is slow server-side; give it more time than the default
+    resp = await request("POST", "/v1/hosting/ai-website", api_key, json=payload, timeout=120)
     return resp.json()
 
 
-def _get_account_websites(api_key: str) -> dict:
-    url = f"{API_BASE_URL}/v1/account/websites"
-    resp = requests.get(url, headers={"x-api-key": api_key})
-    resp.raise_for_status()
+async def _get_account_websites(api_key: str) -> dict:
+    resp = await request("GET", "/v1/account/websites", api_key)
     return resp.json()
 
 
-def tenweb_create_ai_website(
+def _website_payload(
+    business_name: str,
+    business_description: str,
+    business_type: str,
+    subdomain: str,
+    region: str,
+    admin_username: str,
+    admin_password: str,
+    is_demo: int,
+    demo_domain_delete_after_days: int | None,
+) -> dict:
+    payload = {
+        "subdomain": subdomain,
+        "region": region,
+        "site_title": business_name,
+        "admin_username": admin_username,
+        "admin_password": admin_password,
+        "business_type": business_type or "business",
+        "business_name": business_name,
+        "business_description": business_description,
+        "is_demo": int(is_demo or 0),
+    }
+    if payload["is_demo"] == 1 and demo_domain_delete_after_days:
+        payload["demo_domain_delete_after_days"] = int(demo_domain_delete_after_days)
+    return payload
+
+
+async def _create_website(
+    api_key: str,
     business_name: str,
     business_description: str,
     business_type: str = "business",
@@ -192,172 +266,504 @@ def tenweb_create_ai_website(
     admin_password: str | None = None,
     is_demo: int = 0,
     demo_domain_delete_after_days: int | None = None,
-) -> str:
-    api_key = _require_api_key()
-    if not api_key:
-        return "ERROR: TENWEB_API_KEY not set"
+) -> dict:
+    """Create one website and wait (up to the readiness deadline) for its URL.
 
+    Returns a plain dict describing the site; HTTP errors propagate.
+    """
     if not subdomain:
-        subdomain = _generate_random_subdomain()
+        # Pre-checked by the background pool; the unchecked fallback only applies when it's empty
+        subdomain = _take_pooled_subdomain() or _generate_random_subdomain()
     if not admin_password:
         admin_password = _generate_secure_password()
     if not region:
         region = DEFAULT_REGION
 
-    payload = {
+    payload = _website_payload(
+        business_name, business_description, business_type, subdomain, region,
+        admin_username, admin_password, is_demo, demo_domain_delete_after_days,
+    )
+    result = await _post_create_ai_website(payload, api_key)
+    website_id = result.get("website_id")
+    website_url = result.get("website_url")
+
+    # If the URL isn't ready, watch for it in the background and wait up to the
+    # deadline; past that we return the website_id so the caller can poll.
+    # The watcher starts the autologin prefetch as soon as the site is ready.
+    watch = None
+    if not website_url and website_id:
+        watch = await get_readiness_watcher().wait(website_id, _ready_deadline_sec())
+        website_url = watch.website_url
+    elif website_id:
+        _prefetch_autologin(website_id, website_url)
+
+    site = {
+        "status": "ready" if website_url else "pending",
+        "website_id": website_id,
         "subdomain": subdomain,
         "region": region,
-        "site_title": business_name,
+        "website_url": website_url,
+        "admin_url": (website_url + "/wp-admin") if website_url else None,
         "admin_username": admin_username,
         "admin_password": admin_password,
-        "business_type": business_type or "business",
-        "business_name": business_name,
-        "business_description": business_description,
-        "is_demo": int(is_demo or 0),
+        "result": result,
+        "readiness": watch.as_dict() if watch is not None else None,
     }
-    if payload["is_demo"] == 1 and demo_domain_delete_after_days:
-        payload["demo_domain_delete_after_days"] = int(demo_domain_delete_after_days)
+    # The prefetch only starts once the URL is known, so give it a moment to
+    # land; past that, generate_autologin_url picks the token up later.
+    autologin_email = os.getenv("TENWEB_AUTOLOGIN_EMAIL")
+    if autologin_email and website_id and website_url:
+        token = await get_autologin_cache().pop_soon(website_id, autologin_email, _AUTOLOGIN_WAIT_SEC)
+        if token:
+            site["autologin_url"] = _autologin_url(website_url, token, autologin_email)
+        else:
+            site["autologin"] = f"being prepared; call generate_autologin_url with email={autologin_email}"
+    return site
 
-    try:
-        result = _post_create_ai_website(payload, api_key)
-        website_id = result.get("website_id")
-        website_url = result.get("website_url")
 
-        # If URL not ready, poll account websites until available (no timeout)
-        if not website_url and website_id:
-            poll_interval = float(os.getenv("TENWEB_POLL_INTERVAL_SEC", "5"))
-            while True:
-                try:
-                    listing = _get_account_websites(api_key)
-                    items = listing.get("data") or listing.get("websites") or []
-                    for item in items:
-                        try:
-                            if int(item.get("id", -1)) == int(website_id):
-                                site_url = item.get("site_url") or item.get("url")
-                                if site_url:
-                                    website_url = site_url
-                                    break
-                        except Exception:
-                            continue
-                    if website_url:
-                        break
-                except Exception:
-                    pass
-                time.sleep(poll_interval)
-
-        admin_url = (website_url + "/wp-admin") if website_url else None
-        summary = [
-            "Website created via 10Web:",
-            f"- Website ID: {website_id}",
-            f"- Website URL: {website_url}" if website_url else "- Website URL: (still generating)",
-            f"- Admin URL: {admin_url}" if admin_url else "- Admin URL: (still generating)",
-            f"- Username: {admin_username}",
-            f"- Password: {admin_password}",
-        ]
-        raw = {
-            "status": "ok",
-            "request": {
-                "subdomain": subdomain,
-                "region": region,
-                "admin_username": admin_username,
-            },
-            "result": result,
-            "derived": {"website_url": website_url, "admin_url": admin_url},
-        }
-        # Optionally generate auto-login link if email is provided via env
-        autologin_email = os.getenv("TENWEB_AUTOLOGIN_EMAIL")
-        if autologin_email and website_id and website_url:
-            try:
-                auto = _generate_autologin_token(website_id, website_url)
-                token = auto.get("token") or auto.get("data", {}).get("token")
-                if token:
-                    autologin_url = f"{website_url}/wp-admin/?twb_wp_login_token={token}&email={urllib.parse.quote(autologin_email)}"
-                    summary.append(f"- Autologin URL (5 min valid): {autologin_url}")
-                    raw["derived"]["autologin_url"] = autologin_url
-            except Exception:
-                pass
-
-        return "\n".join(summary) + "\n\nraw=" + json.dumps(raw)
-    except requests.HTTPError as he:
-        details = he.response.text if he.response is not None else str(he)
-        return (
-            "ERROR creating website via 10Web.\n"
-            f"- HTTP: {he.response.status_code if he.response else 'unknown'}\n"
-            f"- Details: {details}"
+def _created_website_result(site: dict) -> ToolResult:
+    website_id = site["website_id"]
+    if site["website_url"]:
+        result = ToolResult("ok", "website created and live")
+    else:
+        result = ToolResult(
+            "pending",
+            f"website created, still generating; poll get_website_status with website_id={website_id}",
+        )
+    result.fields = {
+        key: site.get(key)
+        for key in (
+            "website_id", "website_url", "admin_url", "admin_username", "admin_password",
+            "autologin_url", "autologin", "subdomain", "region",
+        )
+    }
+    return result.attach("api_response", site["result"])
+
+
+def _no_api_key() -> str:
+    return ToolResult.error("TENWEB_API_KEY not set").render()
+
+
+def _http_error(action: str, he: httpx.HTTPStatusError) -> str:
+    return (
+        ToolResult.error(f"{action} failed with HTTP {he.response.status_code}", details=he.response.text)
+        .attach("response", he.response.text)
+        .render()
+    )
+
+
+def _api_result(summary: str, resp: httpx.Response, max_fields: int = 12) -> ToolResult:
+    """Top-level scalar fields of a JSON response, with the full body kept as an artifact."""
+    try:
+        body = resp.json()
+    except ValueError:
+        return ToolResult("ok", summary, {"body": resp.text}).attach("response", resp.text)
+    data = body.get("data") if isinstance(body, dict) and isinstance(body.get("data"), dict) else body
+    fields = {}
+    if isinstance(data, dict):
+        scalars = [(k, v) for k, v in data.items() if isinstance(v, (str, int, float, bool))]
+        fields = dict(scalars[:max_fields])
+    return ToolResult("ok", summary, fields).attach("response", body)
+
+
+async def tenweb_create_ai_website(
+    business_name: str,
+    business_description: str,
+    business_type: str = "business",
+    subdomain: str | None = None,
+    region: str = DEFAULT_REGION,
+    admin_username: str = "admin",
+    admin_password: str | None = None,
+    is_demo: int = 0,
+    demo_domain_delete_after_days: int | None = None,
+) -> str:
+    api_key = _require_api_key()
+    if not api_key:
+        return _no_api_key()
+    try:
+        site = await _create_website(
+            api_key, business_name, business_description, business_type, subdomain, region,
+            admin_username, admin_password, is_demo, demo_domain_delete_after_days,
         )
+        return _created_website_result(site).render()
+    except httpx.HTTPStatusError as he:
+        return _http_error("creating website via 10Web", he)
     except Exception as e:
-        return f"ERROR creating website via 10Web: {str(e)}"
+        return ToolResult.error(f"creating website via 10Web failed: {e}").render()
 
 
 class WebsiteIdArgs(BaseModel):
     website_id: int = Field(..., description="10Web website ID")
 
 
-def tenweb_get_account_websites() -> str:
+async def _fetch_account_websites() -> dict:
     api_key = _require_api_key()
     if not api_key:
-        return "ERROR: TENWEB_API_KEY not set"
+        raise ValueError("TENWEB_API_KEY not set")
+    return await _get_account_websites(api_key)
+
+
+_INDEX: WebsiteIndex | None = None
+
+
+def get_website_index() -> WebsiteIndex:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = WebsiteIndex(_fetch_account_websites)
+    return _INDEX
+
+
+async def _lookup_website_url(website_id: int) -> str | None:
+    # Pending sites force a refresh, but all watchers share it: at most one
+    # listing request per TENWEB_INDEX_MIN_REFRESH_SEC however many are waiting.
+    max_age = float(os.getenv("TENWEB_INDEX_MIN_REFRESH_SEC", "3"))
+    return await get_website_index().website_url(website_id, max_age=max_age)
+
+
+_READINESS: ReadinessWatcher | None = None
+
+
+def get_readiness_watcher() -> ReadinessWatcher:
+    global _READINESS
+    if _READINESS is None:
+        _READINESS = ReadinessWatcher(
+            _lookup_website_url,
+            on_ready=lambda handle: _prefetch_autologin(handle.website_id, handle.website_url),
+        )
+    return _READINESS
+
+
+def _ready_deadline_sec() -> float:
+    return float(os.getenv("TENWEB_READY_DEADLINE_SEC", "120"))
+
+
+class WebsiteStatusArgs(BaseModel):
+    website_id: int = Field(..., description="10Web website ID returned by create_ai_website")
+    wait_sec: float = Field(0, description="Seconds to wait for the site to become ready before answering (0 = just report)")
+    cancel: bool = Field(False, description="Stop watching this website")
+
+
+async def tenweb_get_website_status(website_id: int, wait_sec: float = 0, cancel: bool = False) -> str:
+    """Report (or briefly await) readiness of a website created with create_ai_website."""
+    watcher = get_readiness_watcher()
+    if cancel:
+        handle = watcher.cancel(website_id)
+        if handle is None:
+            return ToolResult.error(f"website {website_id} is not being watched").render()
+        return ToolResult("ok", f"watch for website {website_id} is {handle.status}", handle.as_dict()).render()
+    # Starts a watch when none exists (e.g. after an agent restart)
+    handle = await watcher.wait(website_id, min(max(0.0, wait_sec), _ready_deadline_sec()))
+    fields = handle.as_dict()
+    if handle.website_url:
+        fields["admin_url"] = handle.website_url.rstrip("/") + "/wp-admin"
+    status = {"ready": "ok", "pending": "pending"}.get(handle.status, "error")
+    return ToolResult(status, f"website {website_id} is {handle.status}", fields).render()
+
+
+class AccountWebsitesArgs(BaseModel):
+    fields: list[str] | None = Field(
+        None,
+        description="Fields to return per website (default: id, subdomain, site_url, status); ['*'] returns everything",
+    )
+    offset: int = Field(0, description="Index of the first website to return")
+    limit: int = Field(20, description="Page size (max 100)")
+    search: str | None = Field(None, description="Only websites whose subdomain, URL or name contains this text")
+    refresh: bool = Field(False, description="Bypass the cached listing")
+
+
+async def tenweb_get_account_websites(
+    fields: list[str] | None = None,
+    offset: int = 0,
+    limit: int = 20,
+    search: str | None = None,
+    refresh: bool = False,
+) -> str:
+    if not _require_api_key():
+        return _no_api_key()
     try:
-        data = _get_account_websites(api_key)
-        return json.dumps(data)
+        page = await get_website_index().query(fields, offset, limit, search, refresh)
+        result = ToolResult("ok", "", {"next_offset": page["next_offset"], "items": page["items"]})
+        # Items that don't fit are dropped from the end; page on from the last one shown
+        while True:
+            shown = len(result.fields["items"])
+            result.summary = f"{shown} of {page['total']} websites from offset {page['offset']}"
+            result.fields["next_offset"] = page["next_offset"] if shown == len(page["items"]) else page["offset"] + shown
+            result.fit()
+            if len(result.fields["items"]) == shown:
+                return result.render()
     except Exception as e:
-        return f"ERROR fetching account websites: {str(e)}"
+        return ToolResult.error(f"fetching account websites failed: {e}").render()
 
 
-def tenweb_get_website_user_info(website_id: int) -> str:
+async def tenweb_get_website_user_info(website_id: int) -> str:
     api_key = _require_api_key()
     if not api_key:
-        return "ERROR: TENWEB_API_KEY not set"
-    url = f"{API_BASE_URL}/v1/hosting/websites/{website_id}/user_info"
+        return _no_api_key()
     try:
-        resp = requests.get(url, headers={"x-api-key": api_key})
-        resp.raise_for_status()
-        return resp.text
+        resp = await request("GET", f"/v1/hosting/websites/{website_id}/user_info", api_key)
+        return _api_result(f"user_info for website {website_id}", resp).render()
     except Exception as e:
-        return f"ERROR fetching user_info for website {website_id}: {str(e)}"
+        return ToolResult.error(f"fetching user_info for website {website_id} failed: {e}").render()
 
 
-def tenweb_get_website_instance_info(website_id: int) -> str:
+async def tenweb_get_website_instance_info(website_id: int) -> str:
     api_key = _require_api_key()
     if not api_key:
-        return "ERROR: TENWEB_API_KEY not set"
-    url = f"{API_BASE_URL}/v1/hosting/websites/{website_id}/instance-info"
+        return _no_api_key()
     try:
-        resp = requests.get(url, headers={"x-api-key": api_key})
-        resp.raise_for_status()
-        return resp.text
+        resp = await request("GET", f"/v1/hosting/websites/{website_id}/instance-info", api_key)
+        return _api_result(f"instance-info for website {website_id}", resp).render()
     except Exception as e:
-        return f"ERROR fetching instance-info for website {website_id}: {str(e)}"
+        return ToolResult.error(f"fetching instance-info for website {website_id} failed: {e}").render()
 
 
 class SubdomainCheckArgs(BaseModel):
     subdomain: str = Field(..., description="Subdomain to check availability")
 
 
-def tenweb_check_subdomain(subdomain: str) -> str:
+async def tenweb_check_subdomain(subdomain: str) -> str:
     api_key = _require_api_key()
     if not api_key:
-        return "ERROR: TENWEB_API_KEY not set"
-    url = f"{API_BASE_URL}/v1/hosting/websites/subdomain/check?subdomain={urllib.parse.quote(subdomain)}"
+        return _no_api_key()
     try:
-        resp = requests.get(url, headers={"x-api-key": api_key})
-        resp.raise_for_status()
-        return resp.text
+        available = await _is_subdomain_available(subdomain, api_key)
     except Exception as e:
-        return f"ERROR checking subdomain {subdomain}: {str(e)}"
+        return ToolResult.error(f"checking subdomain {subdomain} failed: {e}").render()
+    verdict = {True: "available", False: "taken"}.get(available, "of unknown availability")
+    return ToolResult("ok", f"subdomain {subdomain} is {verdict}", {"subdomain": subdomain, "available": available}).render()
 
 
-def tenweb_generate_subdomain() -> str:
+async def tenweb_generate_subdomain() -> str:
     api_key = _require_api_key()
     if not api_key:
-        return "ERROR: TENWEB_API_KEY not set"
-    url = f"{API_BASE_URL}/v1/hosting/websites/subdomain/generate"
+        return _no_api_key()
+    try:
+        resp = await request("GET", "/v1/hosting/websites/subdomain/generate", api_key)
+        return _api_result("generated subdomain", resp).render()
+    except Exception as e:
+        return ToolResult.error(f"generating subdomain failed: {e}").render()
+
+
+def _parse_subdomain_availability(data) -> bool | None:
+    """Read the availability flag from a subdomain check response; None if absent."""
+    if isinstance(data, dict):
+        for key in ("available", "is_available"):
+            if key in data:
+                return bool(data[key])
+        return _parse_subdomain_availability(data.get("data"))
+    if isinstance(data, bool):
+        return data
+    return None
+
+
+async def _is_subdomain_available(subdomain: str, api_key: str) -> bool | None:
+    resp = await request("GET", "/v1/hosting/websites/subdomain/check", api_key, params={"subdomain": subdomain})
+    try:
+        return _parse_subdomain_availability(resp.json())
+    except ValueError:
+        return None
+
+
+# Subdomains claimed by in-flight creations so concurrent calls never pick the same one
+_RESERVED_SUBDOMAINS: set[str] = set()
+
+
+async def _check_pool_candidate(subdomain: str) -> bool | None:
+    api_key = _require_api_key()
+    if not api_key or subdomain in _RESERVED_SUBDOMAINS:
+        return False
+    return await _is_subdomain_available(subdomain, api_key)
+
+
+_SUBDOMAIN_POOL: SubdomainPool | None = None
+
+
+def get_subdomain_pool() -> SubdomainPool:
+    global _SUBDOMAIN_POOL
+    if _SUBDOMAIN_POOL is None:
+        _SUBDOMAIN_POOL = SubdomainPool(_generate_random_subdomain, _check_pool_candidate)
+    return _SUBDOMAIN_POOL
+
+
+def _take_pooled_subdomain() -> str | None:
+    """Pop a pre-checked subdomain that no in-flight creation is using, without any round trip."""
+    pool = get_subdomain_pool()
+    while (subdomain := pool.take()) is not None:
+        if subdomain not in _RESERVED_SUBDOMAINS:
+            return subdomain
+    return None
+
+
+async def _reserve_subdomain(requested: str | None, api_key: str, attempts: int = 5) -> str:
+    """Claim an available subdomain for one creation: the requested one, else a pooled or generated one.
+
+    Callers must release it with `_RESERVED_SUBDOMAINS.discard(...)` once the
+    create request has finished. A failed availability check counts as
+    available; the create call itself is the final arbiter.
+    """
+    if not requested:
+        pooled = _take_pooled_subdomain()
+        if pooled:
+            _RESERVED_SUBDOMAINS.add(pooled)
+            return pooled
+    candidates = [requested.lower()] if requested else [_generate_random_subdomain() for _ in range(attempts)]
+    for candidate in candidates:
+        if candidate in _RESERVED_SUBDOMAINS:
+            continue
+        _RESERVED_SUBDOMAINS.add(candidate)
+        try:
+            available = await _is_subdomain_available(candidate, api_key)
+        except Exception as e:
+            print(f"[10web] subdomain check failed for {candidate}: {e}", flush=True)
+            available = None
+        if available is not False:
+            return candidate
+        _RESERVED_SUBDOMAINS.discard(candidate)
+    if requested:
+        raise ValueError(f"subdomain '{requested}' is not available")
+    raise ValueError(f"no available subdomain found after {attempts} attempts")
+
+
+class WebsiteSpec(BaseModel):
+    business_name: str = Field(..., description="Name of the business/website")
+    business_description: str = Field(..., description="Description of the business for AI content")
+    business_type: str = Field("business", description="Type of business")
+    subdomain: str | None = Field(None, description="Subdomain to use; auto-generated if not provided")
+    region: str | None = Field(None, description="Deployment region; defaults to the batch region")
+
+
+class CreateAIWebsitesBatchArgs(BaseModel):
+    sites: list[WebsiteSpec] = Field(..., min_length=1, description="One entry per website to create")
+    region: str = Field(DEFAULT_REGION, description="Default region for sites that don't set one")
+    admin_username: str = Field("admin", description="Admin username for every site")
+    is_demo: int = Field(0, description="1 to create demo sites that auto-expire; else 0")
+    demo_domain_delete_after_days: int | None = Field(None, description="If demo=1, number of days before deletion (1-30)")
+    deadline_sec: float | None = Field(None, description="How long to wait for sites to become ready (default TENWEB_READY_DEADLINE_SEC)")
+    thread_id: str | None = Field(None, description="Coral threadId to post each site's result to as soon as it is ready")
+    mentions: list[str] | None = Field(None, description="Agent IDs to mention in those per-site messages (e.g. the senderId)")
+
+
+# Coral send_message tool, set in main(); lets long-running tools post progress to a thread
+_CORAL_SEND_MESSAGE = None
+
+
+async def _post_to_thread(thread_id: str, mentions: list[str] | None, content: str) -> None:
+    if _CORAL_SEND_MESSAGE is None:
+        return
     try:
-        resp = requests.get(url, headers={"x-api-key": api_key})
-        resp.raise_for_status()
-        return resp.text
+        await _CORAL_SEND_MESSAGE.ainvoke({"threadId": thread_id, "content": content, "mentions": mentions or []})
     except Exception as e:
-        return f"ERROR generating subdomain: {str(e)}"
+        print(f"[10web] failed to post progress to thread {thread_id}: {e}", flush=True)
+
+
+def _format_batch_item(item: dict) -> str:
+    name = item["business_name"]
+    if item["status"] == "error":
+        return f"- [{item['index']}] {name}: ERROR {item['error']}"
+    if item["status"] == "ready":
+        return (
+            f"- [{item['index']}] {name}: {item['website_url']} (admin {item['admin_url']},"
+            f" user {item['admin_username']}, password {item['admin_password']})"
+        )
+    return (
+        f"- [{item['index']}] {name}: still generating, website_id={item['website_id']}"
+        f" (user {item['admin_username']}, password {item['admin_password']})"
+    )
+
+
+async def tenweb_create_ai_websites_batch(
+    sites: list[WebsiteSpec],
+    region: str = DEFAULT_REGION,
+    admin_username: str = "admin",
+    is_demo: int = 0,
+    demo_domain_delete_after_days: int | None = None,
+    deadline_sec: float | None = None,
+    thread_id: str | None = None,
+    mentions: list[str] | None = None,
+) -> str:
+    """Create many websites at once and report each one as soon as it is ready.
+
+    Subdomains are checked and reserved for all sites in parallel, creation
+    requests are limited to TENWEB_BATCH_CONCURRENCY at a time, and every
+    created site is followed by a readiness watch until the shared deadline.
+    """
+    api_key = _require_api_key()
+    if not api_key:
+        return _no_api_key()
+    max_sites = int(os.getenv("TENWEB_BATCH_MAX_SITES", "25"))
+    if len(sites) > max_sites:
+        return ToolResult.error(f"batch has {len(sites)} sites; the limit is {max_sites} (TENWEB_BATCH_MAX_SITES)").render()
+
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + (deadline_sec if deadline_sec is not None else _ready_deadline_sec())
+    submit_slots = asyncio.Semaphore(int(os.getenv("TENWEB_BATCH_CONCURRENCY", "3")))
+    watcher = get_readiness_watcher()
+
+    async def create_one(index: int, spec: WebsiteSpec) -> dict:
+        if isinstance(spec, dict):
+            spec = WebsiteSpec(**spec)
+        item = {
+            "index": index,
+            "business_name": spec.business_name,
+            "admin_username": admin_username,
+            "admin_password": _generate_secure_password(),
+        }
+        subdomain = None
+        try:
+            subdomain = await _reserve_subdomain(spec.subdomain, api_key)
+            payload = _website_payload(
+                spec.business_name, spec.business_description, spec.business_type, subdomain,
+                spec.region or region or DEFAULT_REGION, admin_username, item["admin_password"],
+                is_demo, demo_domain_delete_after_days,
+            )
+            async with submit_slots:
+                result = await _post_create_ai_website(payload, api_key)
+        except httpx.HTTPStatusError as he:
+            return {**item, "status": "error", "subdomain": subdomain,
+                    "error": f"HTTP {he.response.status_code}: {he.response.text[:300]}"}
+        except Exception as e:
+            return {**item, "status": "error", "subdomain": subdomain, "error": str(e)}
+        finally:
+            if subdomain:
+                _RESERVED_SUBDOMAINS.discard(subdomain)
+
+        website_id = result.get("website_id")
+        website_url = result.get("website_url")
+        if not website_url and website_id:
+            website_url = (await watcher.wait(website_id, ends_at - loop.time())).website_url
+        elif website_id:
+            _prefetch_autologin(website_id, website_url)
+        return {
+            **item,
+            "status": "ready" if website_url else "pending",
+            "subdomain": subdomain,
+            "website_id": website_id,
+            "website_url": website_url,
+            "admin_url": (website_url.rstrip("/") + "/wp-admin") if website_url else None,
+        }
+
+    tasks = [asyncio.create_task(create_one(i, spec)) for i, spec in enumerate(sites, 1)]
+    items = []
+    for done in asyncio.as_completed(tasks):
+        item = await done
+        items.append(item)
+        line = _format_batch_item(item)
+        print(f"[10web.batch] {line}", flush=True)
+        if thread_id:
+            await _post_to_thread(thread_id, mentions, f"{PROGRESS_PREFIX}Website {len(items)}/{len(tasks)}:\n{line}")
+
+    counts = {status: sum(1 for i in items if i["status"] == status) for status in ("ready", "pending", "error")}
+    summary = (
+        f"batch of {len(items)} websites: {counts['ready']} ready, {counts['pending']} still generating,"
+        f" {counts['error']} failed; poll pending ones with get_website_status"
+    )
+    ordered = sorted(items, key=lambda i: i["index"])
+    status = "ok" if counts["ready"] == len(items) else ("error" if counts["error"] == len(items) else "pending")
+    return (
+        ToolResult(status, summary, {"sites": [_format_batch_item(i)[2:] for i in ordered]})
+        .attach("items", ordered)
+        .render()
+    )
 
 
 class AutoLoginArgs(BaseModel):
@@ -366,41 +772,62 @@ class AutoLoginArgs(BaseModel):
     email: str = Field(..., description="Email to use for autologin (existing admin or will create one)")
 
 
-def _generate_autologin_token(website_id: int, website_url: str) -> dict:
+async def _generate_autologin_token(website_id: int, website_url: str) -> dict:
     api_key = _require_api_key()
     if not api_key:
         raise ValueError("TENWEB_API_KEY not set")
     admin_url = f"{website_url.rstrip('/')}/wp-admin"
-    url = f"{API_BASE_URL}/v1/account/websites/{website_id}/single?admin_url={urllib.parse.quote(admin_url)}"
-    resp = requests.get(url, headers={"x-api-key": api_key})
-    resp.raise_for_status()
+    resp = await request(
+        "GET", f"/v1/account/websites/{website_id}/single", api_key, params={"admin_url": admin_url}
+    )
     try:
         return resp.json()
     except Exception:
         return {"raw": resp.text}
 
 
-def tenweb_generate_autologin_url(website_id: int, website_url: str, email: str) -> str:
+async def _fetch_autologin_token(website_id: int, website_url: str) -> str | None:
+    data = await _generate_autologin_token(website_id, website_url)
+    return data.get("token") or (data.get("data") or {}).get("token")
+
+
+def _autologin_url(website_url: str, token: str, email: str) -> str:
+    return f"{website_url.rstrip('/')}/wp-admin/?twb_wp_login_token={token}&email={urllib.parse.quote(email)}"
+
+
+_AUTOLOGIN: AutologinTokenCache | None = None
+# How long a create reply waits for the autologin prefetch before leaving the link out
+_AUTOLOGIN_WAIT_SEC = float(os.getenv("TENWEB_AUTOLOGIN_WAIT_SEC", "2"))
+
+
+def get_autologin_cache() -> AutologinTokenCache:
+    global _AUTOLOGIN
+    if _AUTOLOGIN is None:
+        _AUTOLOGIN = AutologinTokenCache(_fetch_autologin_token)
+    return _AUTOLOGIN
+
+
+def _prefetch_autologin(website_id: int, website_url: str | None) -> None:
+    """Fetch a token for TENWEB_AUTOLOGIN_EMAIL in the background once a site has a URL."""
+    email = os.getenv("TENWEB_AUTOLOGIN_EMAIL")
+    if email and website_url and _require_api_key():
+        get_autologin_cache().prefetch(website_id, website_url, email)
+
+
+async def tenweb_generate_autologin_url(website_id: int, website_url: str, email: str) -> str:
     """Return a one-click autologin URL for the WP admin, valid for ~5 minutes."""
     try:
-        data = _generate_autologin_token(website_id, website_url)
-        token = data.get("token") or (data.get("data") or {}).get("token")
+        token = await get_autologin_cache().take(website_id, website_url, email)
         if token:
-            autologin_url = f"{website_url.rstrip('/')}/wp-admin/?twb_wp_login_token={token}&email={urllib.parse.quote(email)}"
-            return json.dumps({
-                "status": "ok",
-                "autologin_url": autologin_url,
-                "note": "Token is single-use and expires in ~5 minutes",
-            })
-        return json.dumps({"status": "error", "message": "Token not found", "raw": data})
-    except requests.HTTPError as he:
-        return json.dumps({
-            "status": "error",
-            "http": he.response.status_code if he.response else None,
-            "details": he.response.text if he.response is not None else str(he),
-        })
+            return ToolResult(
+                "ok", "autologin URL (single-use, expires in ~5 minutes)",
+                {"autologin_url": _autologin_url(website_url, token, email)},
+            ).render()
+        return ToolResult.error("token not found in response").render()
+    except httpx.HTTPStatusError as he:
+        return _http_error("generating autologin token", he)
     except Exception as e:
-        return json.dumps({"status": "error", "message": str(e)})
+        return ToolResult.error(f"generating autologin token failed: {e}").render()
 
 
 def tenweb_tools():
@@ -413,46 +840,73 @@ def tenweb_tools():
                 "region (defaults to 'us-central1-c'), admin_username (default 'admin'), admin_password (auto-generated), "
                 "is_demo (0 or 1), demo_domain_delete_after_days (1-30 when is_demo=1)."
             ),
-            func=tenweb_create_ai_website,
+            coroutine=tenweb_create_ai_website,
             args_schema=CreateAIWebsiteArgs,
         ),
+        StructuredTool.from_function(
+            name="create_ai_websites_batch",
+            description=(
+                "Create several AI-generated WordPress websites in one call (e.g. one per location or product line). "
+                "Required: sites (list of {business_name, business_description, business_type?, subdomain?, region?}). "
+                "Optional: region, admin_username, is_demo, demo_domain_delete_after_days, deadline_sec, and "
+                "thread_id + mentions to have each site's result posted to the thread as soon as it is ready."
+            ),
+            coroutine=tenweb_create_ai_websites_batch,
+            args_schema=CreateAIWebsitesBatchArgs,
+        ),
         StructuredTool.from_function(
             name="generate_autologin_url",
             description=(
                 "Generate a one-click admin autologin URL for a website (no password needed). "
                 "Required: website_id, website_url, email (via TENWEB_AUTOLOGIN_EMAIL env or pass to agent)."
             ),
-            func=tenweb_generate_autologin_url,
+            coroutine=tenweb_generate_autologin_url,
             args_schema=AutoLoginArgs,
         ),
+        StructuredTool.from_function(
+            name="get_website_status",
+            description=(
+                "Check whether a website returned by create_ai_website as 'still generating' is ready. "
+                "Required: website_id. Optional: wait_sec to wait briefly for it, cancel=true to stop watching. "
+                "Returns status (pending|ready|failed|cancelled) and website_url/admin_url once ready."
+            ),
+            coroutine=tenweb_get_website_status,
+            args_schema=WebsiteStatusArgs,
+        ),
         StructuredTool.from_function(
             name="tenweb_get_account_websites",
-            description="List all websites for the 10Web account (raw JSON).",
-            func=tenweb_get_account_websites,
+            description=(
+                "List websites on the 10Web account from a cached index, one page at a time. "
+                "Optional: fields (default id, subdomain, site_url, status; ['*'] for all), offset, limit, "
+                "search, refresh. Returns total, next_offset and items (JSON)."
+            ),
+            coroutine=tenweb_get_account_websites,
+            args_schema=AccountWebsitesArgs,
         ),
         StructuredTool.from_function(
             name="tenweb_get_website_user_info",
             description="Get user/db/sftp info for a website by ID (raw JSON).",
-            func=tenweb_get_website_user_info,
+            coroutine=tenweb_get_website_user_info,
             args_schema=WebsiteIdArgs,
         ),
         StructuredTool.from_function(
             name="tenweb_get_website_instance_info",
             description="Get instance info (IP, region) for a website by ID (raw JSON).",
-            func=tenweb_get_website_instance_info,
+            coroutine=tenweb_get_website_instance_info,
             args_schema=WebsiteIdArgs,
         ),
         StructuredTool.from_function(
             name="tenweb_check_subdomain",
             description="Check if a subdomain is available.",
-            func=tenweb_check_subdomain,
+            coroutine=tenweb_check_subdomain,
             args_schema=SubdomainCheckArgs,
         ),
         StructuredTool.from_function(
             name="tenweb_generate_subdomain",
             description="Generate a random available subdomain via API.",
-            func=tenweb_generate_subdomain,
+            coroutine=tenweb_generate_subdomain,
         ),
+        get_artifact_tool(),
     ]
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+
+@dataclass
+class WatchHandle:
+    website_id: int
+    status: str = "pending"  # pending | ready | failed | cancelled
+    website_url: Optional[str] = None
+    error: Optional[str] = None
+    polls: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    on_ready: list[Callable[["WatchHandle"], Any]] = field(default_factory=list, repr=False)
+
+    @property
+    def elapsed_sec(self) -> float:
+        return round(time.monotonic() - self.started_at, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "website_id": self.website_id,
+            "status": self.status,
+            "website_url": self.website_url,
+            "error": self.error,
+            "polls": self.polls,
+            "elapsed_sec": self.elapsed_sec,
+        }
+
+
+class ReadinessWatcher:
+    """Watches newly created websites until their URL appears in the account listing.
+
+    Each website gets one background task that polls with jittered
+    exponential backoff and gives up after `max_watch_sec`. Callers await
+    a handle with their own deadline and get it back still "pending" if the
+    site isn't ready by then; the watch keeps running and can be polled later.
+    Finished handles are kept for `retain_sec` so status queries still see them.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[int], Awaitable[Optional[str]]],
+        initial_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        max_watch_sec: Optional[float] = None,
+        on_ready: Optional[Callable[[WatchHandle], Any]] = None,
+        retain_sec: Optional[float] = None,
+    ):
+        self._lookup = lookup
+        self._on_ready = on_ready
+        self.initial_interval = initial_interval or float(os.getenv("TENWEB_POLL_INTERVAL_SEC", "5"))
+        self.max_interval = max_interval or float(os.getenv("TENWEB_POLL_MAX_INTERVAL_SEC", "60"))
+        self.max_watch_sec = max_watch_sec or float(os.getenv("TENWEB_WATCH_MAX_SEC", "1800"))
+        self.retain_sec = retain_sec or float(os.getenv("TENWEB_WATCH_RETAIN_SEC", "3600"))
+        self._handles: dict[int, WatchHandle] = {}
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.retain_sec
+        for website_id, handle in list(self._handles.items()):
+            if handle.finished_at is not None and handle.finished_at < cutoff:
+                del self._handles[website_id]
+
+    def get(self, website_id: int) -> Optional[WatchHandle]:
+        return self._handles.get(int(website_id))
+
+    def watch(self, website_id: int, on_ready: Optional[Callable[[WatchHandle], Any]] = None) -> WatchHandle:
+        """Start (or join) the background watch for `website_id`."""
+        website_id = int(website_id)
+        self._prune()
+        handle = self._handles.get(website_id)
+        if handle is None or handle.status in ("failed", "cancelled"):
+            handle = WatchHandle(website_id=website_id)
+            self._handles[website_id] = handle
+            handle.task = asyncio.create_task(self._run(handle), name=f"tenweb-ready-{website_id}")
+        if on_ready is not None:
+            if handle.status == "ready":
+                on_ready(handle)
+            else:
+                handle.on_ready.append(on_ready)
+        return handle
+
+    async def wait(self, website_id: int, deadline_sec: float) -> WatchHandle:
+        """Wait up to `deadline_sec` for the site; returns the handle either way.
+
+        A watch cancelled meanwhile comes back with status "cancelled"; the
+        cancellation never reaches the caller.
+        """
+        handle = self.watch(website_id)
+        if handle.task is not None and not handle.task.done():
+            await asyncio.wait({handle.task}, timeout=max(0.0, deadline_sec))
+        return handle
+
+    def cancel(self, website_id: int) -> Optional[WatchHandle]:
+        handle = self.get(website_id)
+        if handle is not None and handle.task is not None and not handle.task.done():
+            handle.task.cancel()
+            # The task only sees the cancellation on its next step; report it now
+            handle.status = "cancelled"
+            handle.finished_at = time.monotonic()
+        return handle
+
+    async def _run(self, handle: WatchHandle) -> None:
+        interval = self.initial_interval
+        try:
+            while True:
+                handle.polls += 1
+                try:
+                    url = await self._lookup(handle.website_id)
+                except Exception as e:
+                    url = None
+                    handle.error = f"last poll failed: {e}"
+                if url:
+                    handle.website_url = url
+                    handle.status = "ready"
+                    handle.error = None
+                    print(f"[10web.readiness] website {handle.website_id} ready after {handle.elapsed_sec}s: {url}", flush=True)
+                    callbacks = ([self._on_ready] if self._on_ready else []) + handle.on_ready
+                    for callback in callbacks:
+                        try:
+                            callback(handle)
+                        except Exception as e:
+                            print(f"[10web.readiness] on_ready callback failed: {e}", flush=True)
+                    return
+                if handle.elapsed_sec >= self.max_watch_sec:
+                    handle.status = "failed"
+                    handle.error = f"not ready after {self.max_watch_sec:g}s"
+                    return
+                await asyncio.sleep(random.uniform(interval / 2, interval))
+                interval = min(self.max_interval, interval * 2)
+        except asyncio.CancelledError:
+            handle.status = "cancelled"
+            raise
+        finally:
+            handle.finished_at = handle.finished_at or time.monotonic()
+            handle.on_ready.clear()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+# Shared by the 10web, video and interface agents (each is its own image); keep the
+# copies in sync.
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+
+# Upper bound on the text a tool hands back to the model
+MAX_RESULT_CHARS = int(os.getenv("TOOL_RESULT_MAX_CHARS", "1500"))
+MAX_VALUE_CHARS = 300
+
+
+class ArtifactStore:
+    """Bounded in-memory store for payloads too large for the prompt, addressed by handle.
+
+    Entries expire after `ttl_sec` and the oldest are evicted beyond `max_items`.
+    """
+
+    def __init__(self, max_items: int = 256, ttl_sec: float = 3600):
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, value: Any) -> str:
+        handle = f"art_{secrets.token_hex(6)}"
+        with self._lock:
+            self._items[handle] = (time.monotonic() + self.ttl_sec, value)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._items.get(handle)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._items[handle]
+                return None
+            return value
+
+
+_STORE = ArtifactStore(
+    max_items=int(os.getenv("ARTIFACT_MAX_ITEMS", "256")),
+    ttl_sec=float(os.getenv("ARTIFACT_TTL_SEC", "3600")),
+)
+
+
+def get_artifact_store() -> ArtifactStore:
+    return _STORE
+
+
+def _compact(value: Any, limit: int = MAX_VALUE_CHARS) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, separators=(",", ":"), default=str)
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+@dataclass
+class ToolResult:
+    """What a tool reports to the model: a status, one-line summary and a few named fields.
+
+    Bulky payloads (API responses, full listings) are attached as artifacts:
+    they stay in the process and the model sees only a handle it can pass to
+    `get_artifact` if it really needs the detail.
+    """
+
+    status: str  # ok | pending | error
+    summary: str
+    fields: dict[str, Any] = field(default_factory=dict)
+    artifacts: dict[str, str] = field(default_factory=dict)
+    # list field -> (items left out, artifact holding the full list), set by fit()
+    omitted: dict[str, tuple[int, str]] = field(default_factory=dict)
+
+    @classmethod
+    def error(cls, summary: str, **fields: Any) -> "ToolResult":
+        return cls("error", summary, fields)
+
+    def attach(self, name: str, payload: Any) -> "ToolResult":
+        if payload not in (None, "", {}, []):
+            self.artifacts[name] = get_artifact_store().put(payload)
+        return self
+
+    def _text(self) -> str:
+        lines = [f"{self.status}: {self.summary}"]
+        for key, value in self.fields.items():
+            if value is None:
+                continue
+            if isinstance(value, list):
+                lines.append(f"{key}:")
+                lines += [f"- {_compact(item)}" for item in value]
+                if key in self.omitted:
+                    count, handle = self.omitted[key]
+                    lines.append(f"- … {count} more not shown; full list: artifact {handle}")
+            else:
+                lines.append(f"{key}: {_compact(value)}")
+        lines += [f"{name}: artifact {handle} (get_artifact)" for name, handle in self.artifacts.items()]
+        return "\n".join(lines)
+
+    def fit(self, max_chars: Optional[int] = None) -> dict[str, int]:
+        """Drop whole items from the end of list fields until the result fits.
+
+        The last list field is trimmed first. The full list goes to an artifact
+        and a closing line says how many items were left out. Returns the
+        number of items left out per field, so paged callers can resume after
+        the last item actually shown.
+        """
+        max_chars = max_chars or MAX_RESULT_CHARS
+        lists = [key for key, value in self.fields.items() if isinstance(value, list) and value]
+        for key in reversed(lists):
+            if len(self._text()) <= max_chars:
+                break
+            items = self.fields[key]
+            full = items
+            if key in self.omitted:
+                count, handle = self.omitted[key]
+            else:
+                count, handle = 0, get_artifact_store().put(full)
+            while items and len(self._text()) > max_chars:
+                items = items[:-1]
+                count += 1
+                self.fields[key] = items
+                self.omitted[key] = (count, handle)
+        return {key: count for key, (count, _) in self.omitted.items()}
+
+    def render(self, max_chars: Optional[int] = None) -> str:
+        max_chars = max_chars or MAX_RESULT_CHARS
+        self.fit(max_chars)
+        text = self._text()
+        if len(text) <= max_chars:
+            return text
+        # Only scalar fields are left to cut here; lists were trimmed whole items at a time
+        handle = get_artifact_store().put(text)
+        return text[: max_chars - 60] + f"\n… truncated; full result: artifact {handle}"
+
+    def __str__(self) -> str:
+        return self.render()
+
+
+def read_artifact(
+    handle: str,
+    path: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 2000,
+    lookup: Optional[Callable[[str], Any]] = None,
+) -> str:
+    """Return a slice of an artifact, optionally narrowed to a dotted path (e.g. `data.0.site_url`).
+
+    `lookup` replaces the shared store, e.g. to also find artifacts a session owns.
+    """
+    value = (lookup or get_artifact_store().get)(handle)
+    if value is None:
+        return ToolResult.error(f"unknown or expired artifact {handle}").render()
+    for part in (path or "").split("."):
+        if not part:
+            continue
+        try:
+            value = value[int(part)] if isinstance(value, list) else value[part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            return ToolResult.error(f"path {path!r} not found in artifact {handle}").render()
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    offset = max(0, offset)
+    limit = max(1, min(limit, 8000))
+    chunk = text[offset:offset + limit]
+    if offset + limit < len(text):
+        chunk += f"\n… {len(text) - offset - limit} more chars; next offset={offset + limit}"
+    return chunk
+
+
+class GetArtifactArgs(BaseModel):
+    handle: str = Field(..., description="Artifact handle from a tool result (art_...)")
+    path: Optional[str] = Field(None, description="Dotted path into a JSON artifact, e.g. data.0.site_url")
+    offset: int = Field(0, description="Character offset to start reading from")
+    limit: int = Field(2000, description="Maximum characters to return (max 8000)")
+
+
+def get_artifact_tool(lookup: Optional[Callable[[str], Any]] = None) -> StructuredTool:
+    def get_artifact(handle: str, path: Optional[str] = None, offset: int = 0, limit: int = 2000) -> str:
+        return read_artifact(handle, path, offset, limit, lookup)
+
+    return StructuredTool.from_function(
+        func=get_artifact,
+        name="get_artifact",
+        description=(
+            "Read the full payload behind an artifact handle from an earlier tool result. "
+            "Only use it when the compact result lacks a detail you need; use path/offset/limit to read a part."
+        ),
+        args_schema=GetArtifactArgs,
+    )
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+
+class SubdomainPool:
+    """A small stock of subdomains already checked as available, refilled in the background.
+
+    `take()` never touches the network: it pops the freshest entry or returns
+    None when the pool is empty, and wakes the refill task either way. Entries
+    older than `max_age_sec` are dropped, since someone else may have claimed
+    the name since it was checked.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[], str],
+        is_available: Callable[[str], Awaitable[Optional[bool]]],
+        size: Optional[int] = None,
+        max_age_sec: Optional[float] = None,
+    ):
+        self._generate = generate
+        self._is_available = is_available
+        self.size = size if size is not None else int(os.getenv("TENWEB_SUBDOMAIN_POOL_SIZE", "5"))
+        self.max_age_sec = max_age_sec or float(os.getenv("TENWEB_SUBDOMAIN_POOL_TTL_SEC", "600"))
+        self._entries: deque[tuple[str, float]] = deque()
+        self._wanted = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self) -> None:
+        if self.size > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._refill_loop(), name="tenweb-subdomain-pool")
+            self._wanted.set()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def take(self) -> Optional[str]:
+        self._drop_stale()
+        subdomain = self._entries.pop()[0] if self._entries else None
+        self._wanted.set()
+        return subdomain
+
+    def _drop_stale(self) -> None:
+        cutoff = time.monotonic() - self.max_age_sec
+        while self._entries and self._entries[0][1] < cutoff:
+            self._entries.popleft()
+
+    async def _refill_loop(self) -> None:
+        failures = 0
+        while True:
+            try:
+                # Also wake up periodically to replace entries before they go stale
+                await asyncio.wait_for(self._wanted.wait(), timeout=self.max_age_sec / 2)
+            except TimeoutError:
+                pass
+            self._wanted.clear()
+            self._drop_stale()
+            attempts = 0
+            while len(self._entries) < self.size and attempts < self.size * 4:
+                attempts += 1
+                candidate = self._generate()
+                if any(candidate == s for s, _ in self._entries):
+                    continue
+                try:
+                    available = await self._is_available(candidate)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    print(f"[10web.subdomains] availability check failed: {e}", flush=True)
+                    await asyncio.sleep(min(60.0, 2.0 ** failures))
+                    continue
+                # Unknown availability (None) isn't good enough for the pool
+                if available:
+                    self._entries.append((candidate, time.monotonic()))
+            print(f"[10web.subdomains] pool refilled: {len(self._entries)}/{self.size} ready", flush=True)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import urllib.parse
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+DEFAULT_FIELDS = ("id", "subdomain", "site_url", "status")
+
+
+def _listing_items(listing: dict) -> list[dict]:
+    return listing.get("data") or listing.get("websites") or []
+
+
+def _site_url(item: dict) -> Optional[str]:
+    return item.get("site_url") or item.get("url") or None
+
+
+def _subdomain(item: dict) -> Optional[str]:
+    if item.get("subdomain"):
+        return str(item["subdomain"]).lower()
+    url = _site_url(item)
+    if not url:
+        return None
+    host = urllib.parse.urlparse(url if "://" in url else f"https://{url}").hostname or ""
+    return host.split(".", 1)[0].lower() or None
+
+
+class WebsiteIndex:
+    """In-memory index of the account's websites, keyed by id and subdomain.
+
+    The listing is fetched at most once per `ttl_sec` no matter how many
+    callers ask (concurrent refreshes share one request), and each refresh
+    is applied as a diff so unchanged entries are kept as they are.
+    """
+
+    def __init__(self, fetch_listing: Callable[[], Awaitable[dict]], ttl_sec: Optional[float] = None):
+        self._fetch_listing = fetch_listing
+        self.ttl_sec = ttl_sec if ttl_sec is not None else float(os.getenv("TENWEB_INDEX_TTL_SEC", "30"))
+        self._by_id: dict[int, dict[str, Any]] = {}
+        self._by_subdomain: dict[str, int] = {}
+        self._order: list[int] = []
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def age_sec(self) -> float:
+        return time.monotonic() - self._fetched_at if self._fetched_at else float("inf")
+
+    async def refresh(self, max_age: Optional[float] = None) -> None:
+        """Refetch the listing unless the index is younger than `max_age` (default: the TTL)."""
+        max_age = self.ttl_sec if max_age is None else max_age
+        if self.age_sec <= max_age:
+            return
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self.age_sec <= max_age:
+                return
+            listing = await self._fetch_listing()
+            self._apply(_listing_items(listing))
+            self._fetched_at = time.monotonic()
+
+    def _apply(self, items: Iterable[dict]) -> None:
+        seen: list[int] = []
+        added = updated = 0
+        for item in items:
+            try:
+                website_id = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            seen.append(website_id)
+            current = self._by_id.get(website_id)
+            if current == item:
+                continue
+            if current is None:
+                added += 1
+            else:
+                updated += 1
+                old_sub = _subdomain(current)
+                if old_sub and self._by_subdomain.get(old_sub) == website_id:
+                    del self._by_subdomain[old_sub]
+            self._by_id[website_id] = item
+            sub = _subdomain(item)
+            if sub:
+                self._by_subdomain[sub] = website_id
+
+        removed = set(self._by_id) - set(seen)
+        for website_id in removed:
+            sub = _subdomain(self._by_id.pop(website_id))
+            if sub and self._by_subdomain.get(sub) == website_id:
+                del self._by_subdomain[sub]
+        self._order = seen
+        if added or updated or removed:
+            print(
+                f"[10web.index] {len(seen)} websites (+{added} ~{updated} -{len(removed)})",
+                flush=True,
+            )
+
+    async def get(self, website_id: int, max_age: Optional[float] = None) -> Optional[dict[str, Any]]:
+        """Look a website up by id, refreshing first if it's missing or has no URL yet."""
+        item = self._by_id.get(int(website_id))
+        if item is None or not _site_url(item):
+            await self.refresh(max_age)
+            item = self._by_id.get(int(website_id))
+        return item
+
+    async def get_by_subdomain(self, subdomain: str, max_age: Optional[float] = None) -> Optional[dict[str, Any]]:
+        await self.refresh(max_age)
+        website_id = self._by_subdomain.get(subdomain.lower())
+        return self._by_id.get(website_id) if website_id is not None else None
+
+    async def website_url(self, website_id: int, max_age: Optional[float] = None) -> Optional[str]:
+        item = await self.get(website_id, max_age)
+        return _site_url(item) if item else None
+
+    async def query(
+        self,
+        fields: Optional[list[str]] = None,
+        offset: int = 0,
+        limit: int = 20,
+        search: Optional[str] = None,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Return one page of websites projected onto `fields` ("*" for everything)."""
+        await self.refresh(0 if refresh else None)
+        items = [self._by_id[i] for i in self._order if i in self._by_id]
+        if search:
+            needle = search.lower()
+            items = [
+                item for item in items
+                if needle in (_subdomain(item) or "") or needle in (_site_url(item) or "").lower()
+                or needle in str(item.get("name") or item.get("site_title") or "").lower()
+            ]
+        fields = list(fields or DEFAULT_FIELDS)
+        offset = max(0, offset)
+        limit = max(1, min(limit, 100))
+        page = items[offset:offset + limit]
+        if "*" not in fields:
+            page = [self._project(item, fields) for item in page]
+        next_offset = offset + limit if offset + limit < len(items) else None
+        return {"total": len(items), "offset": offset, "next_offset": next_offset, "items": page}
+
+    @staticmethod
+    def _project(item: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+        derived = {"subdomain": _subdomain(item), "site_url": _site_url(item)}
+        return {f: item.get(f, derived.get(f)) for f in fields}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+# Shared by the firecrawl, github, video, 10web and interface agents (each is
+# its own image); keep the copies in sync.
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Matches key="value" / key='value' attributes in the text form of a mention
+_ATTR_RE = re.compile(r"""(threadId|senderId|content)\s*[=:]\s*(?:"((?:[^"\\]|\\.)*)"|'((?:[^'\\]|\\.)*)')""")
+
+
+@dataclass
+class Mention:
+    thread_id: str
+    sender_id: str
+    content: str
+
+    def as_prompt(self) -> str:
+        return f"threadId: {self.thread_id}\nsenderId: {self.sender_id}\ncontent: {self.content}"
+
+
+def find_tool(tools: list, suffix: str) -> Optional[Any]:
+    """Find a Coral tool by name suffix (tool names may be prefixed, e.g. coral_send_message)."""
+    return next((t for t in tools if t.name == suffix or t.name.endswith("_" + suffix)), None)
+
+
+# Interim updates (e.g. one line per finished item of a batch) start with this
+# so whoever is collecting replies doesn't take them for the final answer.
+PROGRESS_PREFIX = "[progress] "
+
+
+def is_progress(content: str) -> bool:
+    return content.lstrip().startswith(PROGRESS_PREFIX.strip())
+
+
+def _from_dict(item: dict) -> Optional[Mention]:
+    thread_id = item.get("threadId") or item.get("thread_id")
+    sender_id = item.get("senderId") or item.get("sender_id") or item.get("sender")
+    if not thread_id or not sender_id:
+        return None
+    return Mention(str(thread_id), str(sender_id), str(item.get("content") or ""))
+
+
+def parse_mentions(raw: Any) -> list[Mention]:
+    """Extract mentions from a wait_for_mentions result (JSON or the older text form)."""
+    if isinstance(raw, (list, tuple)) and raw and not isinstance(raw[0], dict):
+        # MCP content blocks
+        raw = "\n".join(getattr(block, "text", str(block)) for block in raw)
+    data = raw
+    if isinstance(raw, str):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+    if isinstance(data, dict):
+        messages = data.get("messages") or data.get("mentions")
+        data = messages if isinstance(messages, list) else [data]
+    if isinstance(data, list):
+        return [m for m in (_from_dict(item) for item in data if isinstance(item, dict)) if m]
+
+    mentions: list[Mention] = []
+    text = str(raw)
+    # One mention per message element; fall back to the whole text as one
+    for chunk in re.split(r"(?=<\w*Message\b)", text) or [text]:
+        attrs: dict[str, str] = {}
+        for key, dq, sq in _ATTR_RE.findall(chunk):
+            attrs.setdefault(key, dq or sq)
+        mention = _from_dict(attrs)
+        if mention:
+            mentions.append(mention)
+    return mentions
@@ -1,10 +1,11 @@
 import urllib.parse
 from dotenv import load_dotenv
-import os, json, asyncio, traceback
+import os, json, asyncio
 from langchain.chat_models import init_chat_model
 from langchain.prompts import ChatPromptTemplate
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain.agents import create_tool_calling_agent, AgentExecutor
+from mention_loop import executor_handler, llm_coral_tools, run_mention_loop
 
 
 def get_tools_description(tools):
@@ -14,6 +15,7 @@ def get_tools_description(tools):
     )
 
 async def create_agent(coral_tools, agent_tools):
+    coral_tools = llm_coral_tools(coral_tools)
     coral_tools_description = get_tools_description(coral_tools)
     agent_tools_description = get_tools_description(agent_tools)
     combined_tools = coral_tools + agent_tools
@@ -22,20 +24,19 @@ async def create_agent(coral_tools, agent_tools):
             "system",
             f"""You are an agent interacting with the tools from Coral Server and having your own tools. Your task is to perform any instructions coming from any agent. 
             Follow these steps in order:
-            1. Call wait_for_mentions from coral tools (timeoutMs: 30000) to receive mentions from other agents.
-            2. When you receive a mention, keep the thread ID and the sender ID.
-            3. Take 2 seconds to think about the content (instruction) of the message and check only from the list of your tools available for you to action.
-            4. Check the tool schema and make a plan in steps for the task you want to perform.
-            5. Only call the tools you need to perform for each step of the plan to complete the instruction in the content.
-            6. Take 3 seconds and think about the content and see if you have executed the instruction to the best of your ability and the tools. Make this your response as "answer".
-            7. Use `send_message` from coral tools to send a message in the same thread ID to the sender Id you received the mention from, with content: "answer".
-            8. If any error occurs, use `send_message` to send a message in the same thread ID to the sender Id you received the mention from, with content: "error".
-            9. Always respond back to the sender agent even if you have no answer or error.
-            9. Wait for 2 seconds and repeat the process from step 1.
+            1. The mention you are handling is the user message: it gives the thread ID, the sender ID and the content (instruction). Mentions are collected for you; do not call wait_for_mentions.
+            2. Take 2 seconds to think about the content (instruction) of the message and check only from the list of your tools available for you to action.
+            3. Check the tool schema and make a plan in steps for the task you want to perform.
+            4. Only call the tools you need to perform for each step of the plan to complete the instruction in the content.
+            5. Take 3 seconds and think about the content and see if you have executed the instruction to the best of your ability and the tools. Make this your response as "answer".
+            6. Use `send_message` from coral tools to send a message in the same thread ID to the sender Id you received the mention from, with content: "answer".
+            7. If any error occurs, use `send_message` to send a message in the same thread ID to the sender Id you received the mention from, with content: "error".
+            8. Always respond back to the sender agent even if you have no answer or error.
 
             These are the list of coral tools: {coral_tools_description}
             These are the list of your tools: {agent_tools_description}"""
                 ),
+                ("human", "{mention}"),
                 ("placeholder", "{agent_scratchpad}")
 
     ])
@@ -97,16 +98,7 @@ async def main():
 
     agent_executor = await create_agent(coral_tools, github_tools)
 
-    while True:
-        try:
-            print("Starting new agent invocation")
-            await agent_executor.ainvoke({"agent_scratchpad": []})
-            print("Completed agent invocation, restarting loop")
-            await asyncio.sleep(1)
-        except Exception as e:
-            print(f"Error in agent loop: {e}")
-            traceback.print_exc()
-            await asyncio.sleep(5)
+    await run_mention_loop(coral_tools, executor_handler(agent_executor))
 
 if __name__ == "__main__":
     asyncio.run(main())
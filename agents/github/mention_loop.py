@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+# Shared by the firecrawl, github, video and 10web agents (each is its own
+# image); keep the copies in sync. The interface agent routes mentions itself
+# (responses.py) and only ships coral_runtime.py.
+
+import asyncio
+import os
+import traceback
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from coral_runtime import Mention, find_tool, parse_mentions
+
+
+def llm_coral_tools(tools: list) -> list:
+    """Coral tools for a worker's LLM: wait_for_mentions is left out, the mention loop owns it."""
+    wait = find_tool(tools, "wait_for_mentions")
+    return [t for t in tools if t is not wait]
+
+
+MentionHandler = Callable[[Mention], Awaitable[None]]
+
+
+def executor_handler(agent_executor) -> MentionHandler:
+    """Handle each mention with one executor run, seeded with the mention as the user message."""
+
+    async def handle(mention: Mention) -> None:
+        print(f"Starting agent invocation for {mention.sender_id} in thread {mention.thread_id}", flush=True)
+        await agent_executor.ainvoke({"mention": mention.as_prompt(), "agent_scratchpad": []})
+        print("Completed agent invocation", flush=True)
+
+    return handle
+
+
+class MentionWorkerPool:
+    """Runs a mention handler on up to `max_concurrency` mentions at once.
+
+    Mentions on the same thread are handled one at a time in arrival order;
+    different threads proceed concurrently. Once `max_pending` mentions are
+    queued or running, `submit` blocks, so the caller stops pulling new
+    mentions until work drains.
+    """
+
+    def __init__(
+        self,
+        handle: MentionHandler,
+        max_concurrency: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self._handle = handle
+        self.max_concurrency = max_concurrency or int(os.getenv("CORAL_MAX_CONCURRENCY", "4"))
+        self.max_pending = max_pending or int(os.getenv("CORAL_MAX_PENDING", str(self.max_concurrency * 4)))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._capacity = asyncio.Semaphore(self.max_pending)
+        self._threads: dict[str, deque[Mention]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, mention: Mention) -> None:
+        await self._capacity.acquire()
+        queue = self._threads.get(mention.thread_id)
+        if queue is not None:
+            # That thread's worker is running and will pick this up next
+            queue.append(mention)
+            return
+        self._threads[mention.thread_id] = deque([mention])
+        task = asyncio.create_task(self._drain(mention.thread_id), name=f"mentions-{mention.thread_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, thread_id: str) -> None:
+        queue = self._threads[thread_id]
+        try:
+            while queue:
+                mention = queue[0]
+                try:
+                    async with self._slots:
+                        await self._handle(mention)
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise
+                    # Something the handler awaited was cancelled, not this worker; keep draining
+                    print(f"Handling mention from {mention.sender_id} was cancelled", flush=True)
+                except Exception as e:
+                    print(f"Error handling mention from {mention.sender_id}: {e}", flush=True)
+                    print(traceback.format_exc(), flush=True)
+                finally:
+                    queue.popleft()
+                    self._capacity.release()
+        finally:
+            # Anything still queued was never started; give back its capacity too
+            for _ in queue:
+                self._capacity.release()
+            del self._threads[thread_id]
+
+
+async def run_mention_loop(
+    coral_tools: list,
+    handle: MentionHandler,
+    timeout_ms: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+) -> None:
+    """Wait for mentions from Python and dispatch them to a worker pool; runs forever.
+
+    Idle wait timeouts cost nothing: the LLM only runs when `handle` invokes it.
+    Concurrency is capped by `max_concurrency` (CORAL_MAX_CONCURRENCY).
+    """
+    wait_for_mentions = find_tool(coral_tools, "wait_for_mentions")
+    if wait_for_mentions is None:
+        raise RuntimeError("Coral server did not provide a wait_for_mentions tool")
+    timeout_ms = timeout_ms or int(os.getenv("CORAL_WAIT_TIMEOUT_MS", "60000"))
+    pool = MentionWorkerPool(handle, max_concurrency)
+    print(f"Handling up to {pool.max_concurrency} mentions concurrently ({pool.max_pending} pending max)", flush=True)
+
+    while True:
+        try:
+            raw = await wait_for_mentions.ainvoke({"timeoutMs": timeout_ms})
+        except Exception as e:
+            print(f"wait_for_mentions failed: {e}", flush=True)
+            await asyncio.sleep(5)
+            continue
+        for mention in parse_mentions(raw):
+            await pool.submit(mention)
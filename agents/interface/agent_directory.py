@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+DIRECTORY_TTL_SEC = float(os.getenv("AGENT_DIRECTORY_TTL_SEC", "300"))
+# Refreshes triggered by unknown senders are at most this often
+MIN_REFRESH_SEC = float(os.getenv("AGENT_DIRECTORY_MIN_REFRESH_SEC", "10"))
+MAX_DESCRIPTION_CHARS = 200
+
+logger = logging.getLogger(__name__)
+
+# Text form of list_agents: one agent per line, e.g. "ID: firecrawl, Description: ..."
+_LINE_RE = re.compile(r"""(?:agent\s*)?id["']?\s*[:=]\s*["']?([\w.-]+)["']?[,;\s]*(?:description["']?\s*[:=]\s*["']?(.*?)["']?\s*[,}]?\s*)?$""", re.IGNORECASE)
+
+
+def _to_text(raw: Any) -> str:
+    if isinstance(raw, (list, tuple)) and raw and not isinstance(raw[0], dict):
+        return "\n".join(getattr(block, "text", str(block)) for block in raw)
+    return raw if isinstance(raw, str) else json.dumps(raw, default=str)
+
+
+def _parse_agents(raw: Any) -> Dict[str, str]:
+    """Map agent id -> description from a list_agents result (JSON or text)."""
+    text = _to_text(raw)
+    data: Any = None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        pass
+    if isinstance(data, dict):
+        data = data.get("agents") or data.get("data") or list(data.values())
+    if isinstance(data, list):
+        agents = {}
+        for item in data:
+            if isinstance(item, dict) and (item.get("id") or item.get("agentId")):
+                agents[str(item.get("id") or item.get("agentId"))] = str(item.get("description") or "")
+        return agents
+    agents = {}
+    for line in text.splitlines():
+        match = _LINE_RE.search(line.strip(" -*"))
+        if match:
+            agents[match.group(1)] = (match.group(2) or "").strip()
+    return agents
+
+
+class AgentDirectory:
+    """Connected agents and their descriptions, cached from list_agents.
+
+    Loaded on connect and refreshed after `ttl_sec`, or early when a mention
+    arrives from an agent we haven't seen (someone joined). Each unknown
+    sender triggers that at most once per `ttl_sec` (a front end never shows
+    up in the list), and early refreshes are at least MIN_REFRESH_SEC apart.
+    Concurrent refreshes share one call. `render()` is sorted and only changes
+    when membership does, so the prompt prefix it sits in stays cacheable.
+    """
+
+    def __init__(self, list_agents_tool: Any, self_id: Optional[str] = None, ttl_sec: float = DIRECTORY_TTL_SEC):
+        self._list_agents = list_agents_tool
+        self._self_id = self_id
+        self.ttl_sec = ttl_sec
+        self.agents: Dict[str, str] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+        self._checked: Dict[str, float] = {}
+
+    @property
+    def age_sec(self) -> float:
+        return time.monotonic() - self._fetched_at if self._fetched_at else float("inf")
+
+    async def refresh(self, max_age: Optional[float] = None) -> None:
+        max_age = self.ttl_sec if max_age is None else max_age
+        if self.age_sec <= max_age:
+            return
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self.age_sec <= max_age:
+                return
+            raw = await self._list_agents.ainvoke({"includeDetails": True})
+            agents = _parse_agents(raw)
+            agents.pop(self._self_id, None)
+            if agents.keys() != self.agents.keys():
+                logger.info(f"Agent directory: {sorted(agents)}")
+            self.agents = agents
+            self._fetched_at = time.monotonic()
+
+    def refresh_soon(self, max_age: Optional[float] = None) -> None:
+        """Refresh in the background; callers keep using the current entries meanwhile."""
+        if self._background is not None and not self._background.done():
+            return
+
+        async def run() -> None:
+            try:
+                await self.refresh(max_age)
+            except Exception as e:
+                logger.error(f"Agent directory refresh failed: {e}")
+
+        self._background = asyncio.create_task(run(), name="interface-agent-directory")
+
+    def note_agent(self, agent_id: str) -> None:
+        """Called for every agent we hear from; an unknown one means membership changed."""
+        if agent_id == self._self_id or not self._fetched_at or agent_id in self.agents:
+            return
+        now = time.monotonic()
+        if now - self._checked.get(agent_id, float("-inf")) < self.ttl_sec:
+            return
+        self._checked = {a: t for a, t in self._checked.items() if now - t < self.ttl_sec}
+        self._checked[agent_id] = now
+        self.refresh_soon(max_age=MIN_REFRESH_SEC)
+
+    async def current(self) -> Dict[str, str]:
+        """Entries for a new request: wait only for the first load, otherwise refresh behind the scenes."""
+        if not self._fetched_at:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Agent directory load failed: {e}")
+        elif self.age_sec > self.ttl_sec:
+            self.refresh_soon()
+        return self.agents
+
+    def render(self) -> str:
+        if not self.agents:
+            return "(no other agents connected; call list_agents if you expected some)"
+        lines = []
+        for agent_id in sorted(self.agents):
+            description = " ".join(self.agents[agent_id].split())
+            if len(description) > MAX_DESCRIPTION_CHARS:
+                description = description[: MAX_DESCRIPTION_CHARS - 1] + "…"
+            lines.append(f"- {agent_id}: {description}" if description else f"- {agent_id}")
+        return "\n".join(lines)
@@ -9,10 +9,16 @@ from langchain.chat_models import init_chat_model
 from langchain.prompts import ChatPromptTemplate
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain.agents import create_tool_calling_agent, AgentExecutor
+from agent_directory import AgentDirectory
+from coral_runtime import Mention, find_tool
+from responses import MentionRouter, get_collect_responses_tool, thread_claiming_tool
+from memory import HISTORY_TOKEN_BUDGET, ConversationMemory, llm_summarizer, lookup_artifact
+from results import get_artifact_tool
+from sessions import MAX_CONCURRENT_SESSIONS, Session, SessionManager
+from task_graph import TaskGraphRunner, get_task_graph_tool
 
 REQUEST_QUESTION_TOOL = "request-question"
 ANSWER_QUESTION_TOOL = "answer-question"
-MAX_CHAT_HISTORY = 3
 DEFAULT_TEMPERATURE = 0.0
 DEFAULT_MAX_TOKENS = 8000
 SLEEP_INTERVAL = 1
@@ -92,24 +98,11 @@ def get_tools_description(tools: List[Any]) -> str:
     print(f"[VERBOSE] Tools description generation completed. Total length: {len(result)} characters")
     return result
 
-def format_chat_history(chat_history: List[Dict[str, str]]) -> str:
-    print(f"[VERBOSE] Starting chat history formatting with {len(chat_history)} conversations...")
+def format_chat_history(memory: ConversationMemory) -> str:
+    print(f"[VERBOSE] Starting chat history formatting with {len(memory.turns)} recent conversations...")
+    print(f"[VERBOSE] Summary length: {len(memory.summary)} chars, budget: {memory.budget_tokens} tokens")
     
-    if not chat_history:
-        print("[VERBOSE] No chat history found, returning default message")
-        return "No previous chat history available."
-    
-    print(f"[VERBOSE] Processing {len(chat_history)} chat history entries...")
-    history_str = "Previous Conversations (use this to resolve ambiguous references like 'it'):\n"
-    
-    for i, chat in enumerate(chat_history, 1):
-        print(f"[VERBOSE] Processing conversation {i}/{len(chat_history)}")
-        print(f"[VERBOSE] User input length: {len(chat.get('user_input', ''))} chars")
-        print(f"[VERBOSE] Agent response length: {len(chat.get('response', ''))} chars")
-        
-        history_str += f"Conversation {i}:\n"
-        history_str += f"User: {chat['user_input']}\n"
-        history_str += f"Agent: {chat['response']}\n\n"
+    history_str = memory.render()
     
     print(f"[VERBOSE] Chat history formatting completed. Total formatted length: {len(history_str)} characters")
     return history_str
@@ -132,7 +125,8 @@ async def get_user_input(runtime: str, agent_tools: Dict[str, Any]) -> str:
             raise
     else:
         print("[VERBOSE] Using interactive mode - prompting user directly")
-        user_input = input("How can I assist you today? ").strip()
+        # In a worker thread so sessions from other threads keep running while we wait
+        user_input = (await asyncio.to_thread(input, "How can I assist you today? ")).strip()
         print(f"[VERBOSE] Raw user input received: '{user_input}'")
         
         if not user_input:
@@ -168,11 +162,33 @@ async def send_response(runtime: str, agent_tools: Dict[str, Any], response: str
     
     print("[VERBOSE] Response sending completed")
 
-async def create_agent(coral_tools: List[Any]) -> AgentExecutor:
-    print(f"[VERBOSE] Starting agent creation with {len(coral_tools)} coral tools...")
+def create_model():
+    print("[VERBOSE] Initializing chat model...")
+    print(f"[VERBOSE] Model configuration:")
+    print(f"[VERBOSE]   - model: {os.getenv('MODEL_NAME')}")
+    print(f"[VERBOSE]   - provider: {os.getenv('MODEL_PROVIDER')}")
+    print(f"[VERBOSE]   - api_key: {'***' if os.getenv('MODEL_API_KEY') else None}")
+    print(f"[VERBOSE]   - temperature: {float(os.getenv('MODEL_TEMPERATURE', DEFAULT_TEMPERATURE))}")
+    print(f"[VERBOSE]   - max_tokens: {int(os.getenv('MODEL_MAX_TOKENS', DEFAULT_MAX_TOKENS))}")
+    print(f"[VERBOSE]   - base_url: {os.getenv('MODEL_BASE_URL', None)}")
+    
+    model = init_chat_model(
+        model=os.getenv("MODEL_NAME"),
+        model_provider=os.getenv("MODEL_PROVIDER"),
+        api_key=os.getenv("MODEL_API_KEY"),
+        temperature=float(os.getenv("MODEL_TEMPERATURE", DEFAULT_TEMPERATURE)),
+        max_tokens=int(os.getenv("MODEL_MAX_TOKENS", DEFAULT_MAX_TOKENS)),
+        base_url=os.getenv("MODEL_BASE_URL", None)
+    )
+    print("[VERBOSE] Chat model initialized successfully")
+    return model
+
+async def create_agent(coral_tools: List[Any], agent_tools: List[Any]) -> AgentExecutor:
+    print(f"[VERBOSE] Starting agent creation with {len(coral_tools)} coral tools and {len(agent_tools)} agent tools...")
+    combined_tools = coral_tools + agent_tools
     
     print("[VERBOSE] Generating tools description...")
-    coral_tools_description = get_tools_description(coral_tools)
+    coral_tools_description = get_tools_description(combined_tools)
     print(f"[VERBOSE] Tools description generated: {len(coral_tools_description)} characters")
     
     print("[VERBOSE] Creating chat prompt template...")
@@ -180,24 +196,26 @@ async def create_agent(coral_tools: List[Any]) -> AgentExecutor:
         (
             "system",
             f"""Your primary role is to plan tasks sent by the user and send clear instructions to other agents to execute them, focusing solely on questions about the Coral Server, its tools: {coral_tools_description}, and registered agents. 
-            Always use {{chat_history}} to understand the context of the question along with the user's instructions. 
+            Always use the chat history at the end of these instructions to understand the context of the question along with the user's instructions. 
             Think carefully about the question, analyze its intent, and create a detailed plan to address it, considering the roles and capabilities of available agents, description and their tools. 
 
             Follow the steps in order:
-            1. Call list_agents to get all connected agents and their descriptions.
+            1. Use the connected agents listed below and their descriptions. Only call list_agents if the user asks about agents directly or an agent you need is missing from the list.
             2. Check if the question is directly related to Coral Server (e.g., list agents, tool details). For such requests, use appropriate tools to retrieve and return the information.
-            3. If the question requires interaction with other agents, analyze the user's intent using chat history to resolve ambiguous references (e.g., 'it'). Create a detailed plan to delegate tasks:
+            3. If the question requires interaction with other agents, analyze the user's intent using chat history to resolve ambiguous references (e.g., 'it'). Create a detailed plan to delegate tasks as a task graph:
                 - Identify which agents are relevant based on their descriptions and tools.
-                - If the task requires sequential processing (e.g., one agent's output is needed by another), structure the plan to specify the order of agent interactions.
-                - Call create_thread('threadName': 'user_request', 'participantIds': [IDs, including self]) to initiate collaboration.
-                - For each selected agent:
-                - If not in thread, call add_participant(threadId=..., 'participantIds': [agent ID]).
-                - Send clear instructions via send_message(threadId=..., content="instruction", mentions=[agent ID]). Instructions should specify the task, any dependencies (e.g., "use output from Agent X"), and expected output format.
-                - Use wait_for_mentions(timeoutMs=60000) up to 5 times to collect responses.
-                - Store responses for synthesis.
-            4. Synthesize responses into a clear, concise answer, referencing chat history if relevant to maintain context.
+                - Write one task per agent request: a short id, the agent ID, and a clear instruction that specifies the task and the expected output format.
+                - If a task needs another task's output (e.g., one agent's output is needed by another), list that task's id in depends_on; its output is appended to the instruction automatically. Leave depends_on empty for tasks that can run in parallel.
+                - Call run_task_graph once with all tasks. It creates the thread, sends the messages, waits for every reply and returns them keyed by task id. Do not call create_thread, send_message or wait_for_mentions yourself for the plan.
+                - If a task comes back as timeout, error or skipped, mention that in the answer rather than retrying blindly.
+                - For a follow-up to an agent outside the plan, use send_message and then call collect_responses once with every agent you mentioned; it waits for all their replies together.
+            4. Synthesize the task results into a clear, concise answer, referencing chat history if relevant to maintain context.
             5. Return the answer.
 
+            Connected agents (ID: description):
+            {{agent_directory}}
+
+            {{chat_history}}
             """
         ),
         ("human", "{user_input}"),
@@ -205,31 +223,14 @@ async def create_agent(coral_tools: List[Any]) -> AgentExecutor:
     ])
     print("[VERBOSE] Chat prompt template created successfully")
 
-    print("[VERBOSE] Initializing chat model...")
-    print(f"[VERBOSE] Model configuration:")
-    print(f"[VERBOSE]   - model: {os.getenv('MODEL_NAME')}")
-    print(f"[VERBOSE]   - provider: {os.getenv('MODEL_PROVIDER')}")
-    print(f"[VERBOSE]   - api_key: {'***' if os.getenv('MODEL_API_KEY') else None}")
-    print(f"[VERBOSE]   - temperature: {float(os.getenv('MODEL_TEMPERATURE', DEFAULT_TEMPERATURE))}")
-    print(f"[VERBOSE]   - max_tokens: {int(os.getenv('MODEL_MAX_TOKENS', DEFAULT_MAX_TOKENS))}")
-    print(f"[VERBOSE]   - base_url: {os.getenv('MODEL_BASE_URL', None)}")
-    
-    model = init_chat_model(
-        model=os.getenv("MODEL_NAME"),
-        model_provider=os.getenv("MODEL_PROVIDER"),
-        api_key=os.getenv("MODEL_API_KEY"),
-        temperature=float(os.getenv("MODEL_TEMPERATURE", DEFAULT_TEMPERATURE)),
-        max_tokens=int(os.getenv("MODEL_MAX_TOKENS", DEFAULT_MAX_TOKENS)),
-        base_url=os.getenv("MODEL_BASE_URL", None)
-    )
-    print("[VERBOSE] Chat model initialized successfully")
+    model = create_model()
 
     print("[VERBOSE] Creating tool calling agent...")
-    agent = create_tool_calling_agent(model, coral_tools, prompt)
+    agent = create_tool_calling_agent(model, combined_tools, prompt)
     print("[VERBOSE] Tool calling agent created successfully")
     
     print("[VERBOSE] Creating agent executor with verbose=True and return_intermediate_steps=True")
-    executor = AgentExecutor(agent=agent, tools=coral_tools, verbose=True, return_intermediate_steps=True)
+    executor = AgentExecutor(agent=agent, tools=combined_tools, verbose=True, return_intermediate_steps=True)
     print("[VERBOSE] Agent executor created successfully")
     
     return executor
@@ -295,17 +296,95 @@ async def main():
         agent_tools = {tool.name: tool for tool in coral_tools}
         print(f"[VERBOSE] Agent tools dictionary created with {len(agent_tools)} tools")
         
+        print("[VERBOSE] Creating mention router and task graph runner...")
+        wait_for_mentions = find_tool(coral_tools, "wait_for_mentions")
+        send_message = find_tool(coral_tools, "send_message")
+        if wait_for_mentions is None or send_message is None:
+            raise ValueError("Required tools 'wait_for_mentions' and 'send_message' not found in coral_tools")
+
+        async def handle_thread_request(mention: Mention) -> None:
+            # Another agent or front end mentioned us on its own thread: one session per thread
+            if mention.sender_id == config["agent_id"]:
+                return
+            # Worker agents answer on threads we opened; a reply from one elsewhere is not a
+            # request, and answering it would mention the worker again and loop
+            if mention.sender_id in agent_directory.agents:
+                logger.info(f"Ignoring mention from agent {mention.sender_id} in thread {mention.thread_id}")
+                return
+            print(f"[VERBOSE] Request from {mention.sender_id} in thread {mention.thread_id}")
+
+            async def reply(response: str) -> None:
+                await send_message.ainvoke({
+                    "threadId": mention.thread_id,
+                    "content": response,
+                    "mentions": [mention.sender_id],
+                })
+
+            sessions.submit(f"thread:{mention.thread_id}", mention.content, reply)
+
+        accept_mentions = os.getenv("INTERFACE_ACCEPT_MENTIONS", "true").lower() == "true"
+        print(f"[VERBOSE] Accepting requests from thread mentions: {accept_mentions}")
+        list_agents = find_tool(coral_tools, "list_agents")
+        if list_agents is None:
+            raise ValueError("Required tool 'list_agents' not found in coral_tools")
+        print("[VERBOSE] Loading agent directory...")
+        agent_directory = AgentDirectory(list_agents, config["agent_id"])
+        await agent_directory.current()
+        print(f"[VERBOSE] Agent directory loaded with {len(agent_directory.agents)} agents (TTL: {agent_directory.ttl_sec}s)")
+
+        mention_router = MentionRouter(
+            wait_for_mentions,
+            inbox=handle_thread_request if accept_mentions else None,
+            on_sender=agent_directory.note_agent,
+        )
+        task_graph_runner = TaskGraphRunner(coral_tools, config["agent_id"], mention_router)
+        print("[VERBOSE] Task graph runner created")
+
+        # Replies are collected in Python; an LLM call to wait_for_mentions would take them from the router
+        llm_coral_tools = []
+        for tool in coral_tools:
+            if tool is wait_for_mentions:
+                continue
+            if tool.name.endswith("create_thread"):
+                tool = thread_claiming_tool(tool, mention_router)
+            llm_coral_tools.append(tool)
+        print(f"[VERBOSE] Hiding {wait_for_mentions.name} from the LLM")
+
         print("[VERBOSE] Creating agent executor...")
-        agent_executor = await create_agent(coral_tools)
+        agent_executor = await create_agent(llm_coral_tools, [
+            get_task_graph_tool(task_graph_runner),
+            get_collect_responses_tool(mention_router),
+            get_artifact_tool(lookup_artifact),
+        ])
         logger.info("Agent executor created")
 
-        print("[VERBOSE] Initializing chat history...")
-        chat_history: List[Dict[str, str]] = []
-        print(f"[VERBOSE] Chat history initialized (max size: {MAX_CHAT_HISTORY})")
+        async def run_turn(session: Session, user_input: str) -> str:
+            print(f"[VERBOSE] Session {session.id}: formatting chat history...")
+            session.memory.activate()
+            formatted_history = format_chat_history(session.memory)
+            await agent_directory.current()
+            print(f"[VERBOSE] Session {session.id}: invoking agent executor ({len(formatted_history)} chars of history)")
+            result = await agent_executor.ainvoke({
+                "user_input": user_input,
+                "agent_scratchpad": [],
+                "agent_directory": agent_directory.render(),
+                "chat_history": formatted_history
+            })
+            response = result.get('output', 'No output returned')
+            print(f"[VERBOSE] Session {session.id}: response of {len(response)} characters")
+            return response
+
+        print("[VERBOSE] Creating session manager...")
+        summarize = llm_summarizer(create_model())
+        sessions = SessionManager(run_turn, new_memory=lambda: ConversationMemory(summarize))
+        print(f"[VERBOSE] Session manager created (max concurrency: {MAX_CONCURRENT_SESSIONS}, history per session: {HISTORY_TOKEN_BUDGET} tokens)")
+        if accept_mentions:
+            mention_router.start()
 
         print("[VERBOSE] ========== ENTERING MAIN LOOP ==========")
         loop_iteration = 0
         
+        # The request-question / console user is one session; thread requests run alongside it
         while True:
             try:
                 loop_iteration += 1
@@ -314,36 +393,11 @@ async def main():
                 print("[VERBOSE] Getting user input...")
                 user_input = await get_user_input(config["runtime"], agent_tools)
                 
-                print("[VERBOSE] Formatting chat history...")
-                formatted_history = format_chat_history(chat_history)
-                print(f"[VERBOSE] Chat history formatted: {len(formatted_history)} characters")
-                
-                print("[VERBOSE] Invoking agent executor...")
-                print(f"[VERBOSE] Agent executor input:")
-                print(f"[VERBOSE]   - user_input: {user_input}")
-                print(f"[VERBOSE]   - chat_history length: {len(formatted_history)} chars")
-                
-                result = await agent_executor.ainvoke({
-                    "user_input": user_input,
-                    "agent_scratchpad": [],
-                    "chat_history": formatted_history
-                })
-                
-                print(f"[VERBOSE] Agent executor completed. Result keys: {list(result.keys())}")
-                response = result.get('output', 'No output returned')
-                print(f"[VERBOSE] Extracted response: {len(response)} characters")
+                print("[VERBOSE] Submitting to the user session...")
+                response = await sessions.submit("user", user_input)
                 
                 print("[VERBOSE] Sending response...")
                 await send_response(config["runtime"], agent_tools, response)
-
-                print("[VERBOSE] Updating chat history...")
-                chat_history.append({"user_input": user_input, "response": response})
-                print(f"[VERBOSE] Chat history updated. Current size: {len(chat_history)}")
-                
-                if len(chat_history) > MAX_CHAT_HISTORY:
-                    removed = chat_history.pop(0)
-                    print(f"[VERBOSE] Chat history size exceeded {MAX_CHAT_HISTORY}, removed oldest entry")
-                    print(f"[VERBOSE] Removed entry preview: {removed['user_input'][:50]}...")
                 
                 print(f"[VERBOSE] Sleeping for {SLEEP_INTERVAL} seconds...")
                 await asyncio.sleep(SLEEP_INTERVAL)
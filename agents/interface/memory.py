@@ -0,0 +1,188 @@
+import asyncio
+import contextvars
+import logging
+import os
+import secrets
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from results import get_artifact_store
+
+# Budget for the whole history block in the prompt, and for any one message in it
+HISTORY_TOKEN_BUDGET = int(os.getenv("INTERFACE_HISTORY_TOKENS", "2000"))
+MESSAGE_TOKEN_LIMIT = int(os.getenv("INTERFACE_MESSAGE_TOKENS", "400"))
+
+_HEADER = "Previous Conversations (use this to resolve ambiguous references like 'it'):\n"
+
+logger = logging.getLogger(__name__)
+
+
+def _tokenizer() -> Optional[Callable[[str], int]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+_COUNT = _tokenizer()
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else the usual ~4 characters per token."""
+    if _COUNT is not None:
+        return _COUNT(text)
+    return (len(text) + 3) // 4
+
+
+def clip_tokens(text: str, limit: int) -> str:
+    if count_tokens(text) <= limit:
+        return text
+    # Shrink by characters until it fits; the estimate keeps this to a couple of passes
+    end = limit * 4
+    while end > 0 and count_tokens(text[:end]) > limit - 1:
+        end = int(end * 0.8)
+    return text[:end].rstrip() + "…"
+
+
+@dataclass
+class Turn:
+    user_input: str
+    response: str
+
+    def render(self) -> str:
+        return f"User: {self.user_input}\nAgent: {self.response}\n"
+
+
+Summarizer = Callable[[str, List[Turn], int], Awaitable[str]]
+
+
+class ConversationMemory:
+    """One session's history, kept within a token budget.
+
+    Messages longer than `message_limit` tokens are kept whole in `artifacts`,
+    owned by the session rather than the shared store so they live as long as
+    the history that points at them, and appear as a clipped excerpt plus the
+    handle (readable with get_artifact while a turn of this session runs).
+    Recent turns are kept as they are; when they no longer fit, the oldest are
+    folded into a running summary by `summarize` in the background. Until that
+    finishes, those turns appear as one-line excerpts, so the rendered history
+    never exceeds the budget.
+    """
+
+    def __init__(
+        self,
+        summarize: Optional[Summarizer] = None,
+        budget_tokens: int = HISTORY_TOKEN_BUDGET,
+        message_limit: int = MESSAGE_TOKEN_LIMIT,
+    ):
+        self._summarize = summarize
+        self.budget_tokens = budget_tokens
+        self.message_limit = min(message_limit, budget_tokens // 4)
+        self.summary_limit = budget_tokens // 4
+        self.summary = ""
+        self.turns: Deque[Turn] = deque()
+        self._unsummarized: Deque[Turn] = deque()
+        self._summarizer: Optional[asyncio.Task] = None
+        self.artifacts: Dict[str, str] = {}
+
+    def activate(self) -> None:
+        """Make this session's artifacts readable by get_artifact for the rest of the current task."""
+        _ACTIVE.set(self)
+
+    def _compact(self, text: str, label: str) -> str:
+        if count_tokens(text) <= self.message_limit:
+            return text
+        handle = f"art_{secrets.token_hex(6)}"
+        self.artifacts[handle] = text
+        note = f"\n[{label} shortened; full text: artifact {handle}]"
+        return clip_tokens(text, self.message_limit - count_tokens(note)) + note
+
+    def add(self, user_input: str, response: str) -> None:
+        self.turns.append(Turn(self._compact(user_input, "message"), self._compact(response, "response")))
+        evicted = False
+        # Keep the latest turn whole; older ones move to the summary when over budget
+        while len(self.turns) > 1 and self._tokens() > self.budget_tokens:
+            turn = self.turns.popleft()
+            if self._summarize is not None:
+                self._unsummarized.append(turn)
+                evicted = True
+        if evicted and (self._summarizer is None or self._summarizer.done()):
+            self._summarizer = asyncio.create_task(self._fold(), name="interface-memory-summary")
+
+    def _excerpts(self) -> List[str]:
+        # Newest first within a summary-sized allowance, then back in order
+        lines, used = [], 0
+        for turn in reversed(self._unsummarized):
+            line = f"- {clip_tokens(turn.user_input, 40)}"
+            used += count_tokens(line)
+            if used > self.summary_limit:
+                break
+            lines.append(line)
+        return lines[::-1]
+
+    def _tokens(self) -> int:
+        return count_tokens(_HEADER) + sum(count_tokens(block) for block in self._blocks())
+
+    def _blocks(self) -> List[str]:
+        blocks = []
+        if self.summary:
+            blocks.append(f"Summary of earlier conversation:\n{self.summary}\n")
+        excerpts = self._excerpts()
+        if excerpts:
+            blocks.append("Earlier requests (being summarized):\n" + "\n".join(excerpts) + "\n")
+        blocks += [f"Conversation {i}:\n{turn.render()}" for i, turn in enumerate(self.turns, 1)]
+        return blocks
+
+    async def _fold(self) -> None:
+        while self._unsummarized:
+            batch = list(self._unsummarized)
+            try:
+                summary = await self._summarize(self.summary, batch, self.summary_limit)
+            except Exception as e:
+                logger.error(f"History summary failed, keeping excerpts: {e}")
+                summary = "\n".join(filter(None, [self.summary] + self._excerpts()))
+            self.summary = clip_tokens(summary.strip(), self.summary_limit)
+            for _ in batch:
+                self._unsummarized.popleft()
+            # A longer summary can push recent turns over the budget as well
+            while len(self.turns) > 1 and self._tokens() > self.budget_tokens:
+                self._unsummarized.append(self.turns.popleft())
+
+    def render(self) -> str:
+        blocks = self._blocks()
+        if not blocks:
+            return "No previous chat history available."
+        text = _HEADER + "\n".join(blocks)
+        # Only a single oversized latest turn can still be over; clip rather than exceed the budget
+        return clip_tokens(text, self.budget_tokens)
+
+
+_ACTIVE: contextvars.ContextVar[Optional[ConversationMemory]] = contextvars.ContextVar("interface_memory", default=None)
+
+
+def lookup_artifact(handle: str) -> Optional[Any]:
+    """Find an artifact in the running session's memory, then in the shared store."""
+    memory = _ACTIVE.get()
+    if memory is not None and handle in memory.artifacts:
+        return memory.artifacts[handle]
+    return get_artifact_store().get(handle)
+
+
+def llm_summarizer(model) -> Summarizer:
+    """Summarize with the chat model: the previous summary plus the turns being dropped."""
+
+    async def summarize(previous: str, turns: List[Turn], limit: int) -> str:
+        transcript = "\n".join(turn.render() for turn in turns)
+        prompt = (
+            f"Update the summary of a conversation between a user and an assistant that delegates work to other agents. "
+            f"Keep names, URLs, IDs, artifact handles, decisions and open questions; drop pleasantries and bulky content. "
+            f"Answer with the new summary only, at most {limit} tokens.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"
+        )
+        message = await model.ainvoke(prompt)
+        return getattr(message, "content", str(message))
+
+    return summarize
@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+from langchain_core.tools import StructuredTool
+
+from coral_runtime import Mention, is_progress, parse_mentions
+
+DEFAULT_RESPONSE_TIMEOUT_SEC = float(os.getenv("RESPONSE_TIMEOUT_SEC", "300"))
+WAIT_TIMEOUT_MS = int(os.getenv("CORAL_WAIT_TIMEOUT_MS", "30000"))
+# How long a reply nobody was waiting for is kept for a later waiter
+UNCLAIMED_TTL_SEC = float(os.getenv("UNCLAIMED_REPLY_TTL_SEC", "600"))
+
+logger = logging.getLogger(__name__)
+
+
+class MentionRouter:
+    """Delivers replies from other agents to whoever is waiting on (thread, sender).
+
+    A single listener calls wait_for_mentions while anyone is waiting, so any
+    number of concurrent collectors share one Coral long-poll. Several waiters on
+    the same key are served first-come first-served, which matches replies to
+    requests because worker agents handle one thread's mentions in order. A
+    waiter keeps its place through progress updates and only gives it up with
+    the final reply, so two asks of one agent never swap replies:
+
+    >>> class Stub:
+    ...     batches = [["[progress] A 1/2", "A final", "B final"]]
+    ...     async def ainvoke(self, args):
+    ...         await asyncio.sleep(0)
+    ...         if not self.batches:
+    ...             await asyncio.sleep(3600)
+    ...         return [{"threadId": "t", "senderId": "w", "content": c} for c in self.batches.pop()]
+    >>> async def asks():
+    ...     router = MentionRouter(Stub())
+    ...     a, b = router.listen("t", "w"), router.listen("t", "w")
+    ...     got = {"A": [await a.get(), await a.get()], "B": [await b.get()]}
+    ...     router._listener.cancel()
+    ...     return {k: [m.content for m in v] for k, v in got.items()}
+    >>> asyncio.run(asks())
+    {'A': ['[progress] A 1/2', 'A final'], 'B': ['B final']}
+
+    Replies nobody is waiting for on threads we opened are kept for
+    UNCLAIMED_TTL_SEC so a later waiter still gets them. With an `inbox`, the router listens all the
+    time and hands mentions on any other thread to it as new requests.
+    `on_sender` sees every sender, e.g. to notice agents that just joined.
+    """
+
+    def __init__(
+        self,
+        wait_for_mentions_tool: Any,
+        timeout_ms: int = WAIT_TIMEOUT_MS,
+        inbox: Optional[Callable[[Mention], Awaitable[None]]] = None,
+        on_sender: Optional[Callable[[str], None]] = None,
+    ):
+        self._wait_tool = wait_for_mentions_tool
+        self._timeout_ms = timeout_ms
+        self._inbox = inbox
+        self._on_sender = on_sender
+        self._waiters: Dict[Tuple[str, str], deque] = {}
+        # (thread, sender) -> (expires_at, mention) entries, oldest first
+        self._unclaimed: Dict[Tuple[str, str], deque] = {}
+        self._own_threads: Set[str] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    def claim_thread(self, thread_id: str) -> None:
+        """Mark a thread as one we opened, so mentions on it are replies rather than requests."""
+        self._own_threads.add(thread_id)
+
+    def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="interface-mention-router")
+
+    def listen(self, thread_id: str, sender_id: str) -> "Replies":
+        """Queue up for `sender_id`'s mentions on `thread_id`: its progress updates, then one reply."""
+        key = (thread_id, sender_id)
+        replies = Replies()
+        self._prune_unclaimed()
+        backlog = self._unclaimed.get(key)
+        while backlog and not replies.closed:
+            replies.put(backlog.popleft()[1])
+        if backlog is not None and not backlog:
+            del self._unclaimed[key]
+        if not replies.closed:
+            self._waiters.setdefault(key, deque()).append(replies)
+            self.start()
+        return replies
+
+    def _has_waiters(self) -> bool:
+        for key in list(self._waiters):
+            queue = self._waiters[key]
+            while queue and queue[0].closed:
+                queue.popleft()
+            if not queue:
+                del self._waiters[key]
+        return bool(self._waiters)
+
+    def _deliver(self, mention: Mention) -> None:
+        if self._on_sender is not None:
+            self._on_sender(mention.sender_id)
+        key = (mention.thread_id, mention.sender_id)
+        queue = self._waiters.get(key)
+        while queue and queue[0].closed:
+            queue.popleft()
+        if queue:
+            # The head waiter keeps its place until its final reply arrives
+            queue[0].put(mention)
+            if queue[0].closed:
+                queue.popleft()
+            return
+        if self._inbox is not None and mention.thread_id not in self._own_threads:
+            asyncio.create_task(self._inbox(mention), name=f"inbox-{mention.thread_id}")
+            return
+        logger.info(f"Unclaimed reply from {mention.sender_id} in thread {mention.thread_id}")
+        self._prune_unclaimed()
+        backlog = self._unclaimed.setdefault(key, deque(maxlen=5))
+        backlog.append((time.monotonic() + UNCLAIMED_TTL_SEC, mention))
+
+    def _prune_unclaimed(self) -> None:
+        now = time.monotonic()
+        for key in list(self._unclaimed):
+            backlog = self._unclaimed[key]
+            while backlog and backlog[0][0] < now:
+                backlog.popleft()
+            if not backlog:
+                del self._unclaimed[key]
+
+    async def _listen(self) -> None:
+        while self._has_waiters() or self._inbox is not None:
+            try:
+                raw = await self._wait_tool.ainvoke({"timeoutMs": self._timeout_ms})
+            except Exception as e:
+                logger.error(f"wait_for_mentions failed: {e}")
+                await asyncio.sleep(2)
+                continue
+            for mention in parse_mentions(raw):
+                self._deliver(mention)
+
+
+class Replies:
+    """One waiter's mentions from a MentionRouter; closed after the final (non-progress) reply."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    def put(self, mention: Mention) -> None:
+        self._queue.put_nowait(mention)
+        if not is_progress(mention.content):
+            self.closed = True
+
+    async def get(self) -> Mention:
+        return await self._queue.get()
+
+    def close(self) -> None:
+        """Give up the place in line, e.g. on timeout; later mentions go to the next waiter."""
+        self.closed = True
+
+
+def parse_thread_id(raw: Any) -> Optional[str]:
+    """Read the thread id from a create_thread result (JSON or text)."""
+    text = raw if isinstance(raw, str) else json.dumps(raw, default=str)
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            thread = data.get("thread") if isinstance(data.get("thread"), dict) else data
+            for key in ("threadId", "id"):
+                if thread.get(key):
+                    return str(thread[key])
+    except ValueError:
+        pass
+    match = re.search(r"""(?:threadId|thread_id|\bid)["']?\s*[=:]\s*["']?([\w-]+)""", text)
+    return match.group(1) if match else None
+
+
+class ResponseAggregator:
+    """Collects the replies owed on one thread, each against its own deadline.
+
+    `expect()` records that an agent owes a reply and starts listening for it
+    straight away; `gather()` returns once every owed reply has arrived or timed
+    out. Progress updates (see coral_runtime.PROGRESS_PREFIX) are kept alongside
+    the reply and don't count as the reply itself.
+    """
+
+    def __init__(self, router: MentionRouter, thread_id: str):
+        self.router = router
+        self.thread_id = thread_id
+        router.claim_thread(thread_id)
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._collectors: Dict[str, asyncio.Task] = {}
+        self._agents: Dict[str, str] = {}
+
+    @property
+    def owed(self) -> List[str]:
+        return [key for key, task in self._collectors.items() if not task.done()]
+
+    def expect(self, agent_id: str, timeout_sec: Optional[float] = None, key: Optional[str] = None) -> str:
+        """Register a reply owed by `agent_id`; `key` tells apart several asks of the same agent."""
+        key = key or agent_id
+        if key in self._collectors:
+            raise ValueError(f"already waiting for a reply under '{key}'")
+        self._agents[key] = agent_id
+        self._collectors[key] = asyncio.create_task(
+            self._collect(key, agent_id, timeout_sec or DEFAULT_RESPONSE_TIMEOUT_SEC),
+            name=f"collect-{key}",
+        )
+        return key
+
+    async def _collect(self, key: str, agent_id: str, timeout_sec: float) -> Dict[str, Any]:
+        started = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + timeout_sec
+        progress: List[str] = []
+        status, output = "timeout", f"no reply within {timeout_sec:g}s"
+        replies = self.router.listen(self.thread_id, agent_id)
+        try:
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    mention = await asyncio.wait_for(replies.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                except Exception as e:
+                    status, output = "error", str(e)
+                    break
+                if is_progress(mention.content):
+                    progress.append(mention.content)
+                    continue
+                status, output = "ok", mention.content
+                break
+        finally:
+            replies.close()
+        result = {
+            "agent_id": agent_id,
+            "status": status,
+            "output": output,
+            "elapsed_sec": round(time.perf_counter() - started, 1),
+        }
+        if progress:
+            result["progress"] = progress
+        self.results[key] = result
+        logger.info(f"Reply '{key}' from {agent_id} -> {status} in {result['elapsed_sec']}s")
+        return result
+
+    def cancel(self, key: str, reason: str) -> None:
+        """Stop waiting for the reply under `key`, e.g. because the request never went out."""
+        task = self._collectors[key]
+        if task.done():
+            return
+        task.cancel()
+        self.results[key] = {"agent_id": self._agents[key], "status": "error", "output": reason}
+
+    async def response(self, key: str) -> Dict[str, Any]:
+        task = self._collectors[key]
+        await asyncio.wait([task])
+        return self.results[key]
+
+    async def gather(self) -> Dict[str, Dict[str, Any]]:
+        if self._collectors:
+            await asyncio.wait(list(self._collectors.values()))
+        return {key: self.results[key] for key in self._collectors}
+
+
+class CollectResponsesArgs(BaseModel):
+    thread_id: str = Field(..., description="Thread the instructions were sent in")
+    agent_ids: List[str] = Field(..., min_length=1, description="Agents that were mentioned and still owe a reply")
+    timeout_sec: Optional[float] = Field(None, description="How long to wait for each agent's reply")
+
+
+def get_collect_responses_tool(router: MentionRouter) -> StructuredTool:
+    async def collect_responses(thread_id: str, agent_ids: List[str], timeout_sec: Optional[float] = None) -> str:
+        aggregator = ResponseAggregator(router, thread_id)
+        for agent_id in dict.fromkeys(agent_ids):
+            aggregator.expect(agent_id, timeout_sec)
+        return json.dumps({"thread_id": thread_id, "results": await aggregator.gather()})
+
+    return StructuredTool.from_function(
+        coroutine=collect_responses,
+        name="collect_responses",
+        description=(
+            "Wait once for replies from every agent you mentioned with send_message in a thread. "
+            "Returns each agent's reply, or a timeout, together as JSON. Use this instead of wait_for_mentions."
+        ),
+        args_schema=CollectResponsesArgs,
+    )
+
+
+def thread_claiming_tool(create_thread_tool: Any, router: MentionRouter) -> StructuredTool:
+    """Wrap create_thread so threads the LLM opens are claimed by the router like the task graph's."""
+    async def create_thread(**kwargs: Any) -> Any:
+        raw = await create_thread_tool.ainvoke(kwargs)
+        thread_id = parse_thread_id(raw)
+        if thread_id:
+            router.claim_thread(thread_id)
+        return raw
+
+    return StructuredTool.from_function(
+        coroutine=create_thread,
+        name=create_thread_tool.name,
+        description=create_thread_tool.description,
+        args_schema=create_thread_tool.args_schema,
+    )
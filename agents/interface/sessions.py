@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from memory import ConversationMemory
+
+MAX_CONCURRENT_SESSIONS = int(os.getenv("INTERFACE_MAX_CONCURRENCY", "4"))
+SESSION_IDLE_TTL_SEC = float(os.getenv("INTERFACE_SESSION_IDLE_SEC", "3600"))
+
+logger = logging.getLogger(__name__)
+
+Reply = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class Session:
+    id: str
+    memory: ConversationMemory
+    pending: Deque[Tuple[str, Optional[Reply], asyncio.Future]] = field(default_factory=deque)
+    busy: bool = False
+    last_active: float = field(default_factory=time.monotonic)
+
+
+TurnRunner = Callable[[Session, str], Awaitable[str]]
+
+
+class SessionManager:
+    """Serves many conversations from one interface process.
+
+    Each session has its own history and runs one turn at a time, so its
+    requests are answered in order with the previous turns in context. Across
+    sessions up to `max_concurrency` turns run at once; when a slot frees, the
+    next waiting session in round-robin order gets it, so a user with a long
+    queue can't starve the others.
+    """
+
+    def __init__(
+        self,
+        run_turn: TurnRunner,
+        max_concurrency: int = MAX_CONCURRENT_SESSIONS,
+        new_memory: Callable[[], ConversationMemory] = ConversationMemory,
+    ):
+        self._run_turn = run_turn
+        self._new_memory = new_memory
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self.sessions: Dict[str, Session] = {}
+        self._ready: Deque[str] = deque()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def submit(self, session_id: str, user_input: str, reply: Optional[Reply] = None) -> asyncio.Future:
+        """Queue a request; the future resolves with the response, which is also passed to `reply`."""
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch(), name="interface-sessions")
+        self._evict_idle()
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = Session(session_id, self._new_memory())
+            logger.info(f"New session {session_id} ({len(self.sessions)} open)")
+        future = asyncio.get_running_loop().create_future()
+        session.pending.append((user_input, reply, future))
+        session.last_active = time.monotonic()
+        self._mark_ready(session)
+        return future
+
+    def _mark_ready(self, session: Session) -> None:
+        if session.pending and not session.busy and session.id not in self._ready:
+            self._ready.append(session.id)
+            self._wakeup.set()
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - SESSION_IDLE_TTL_SEC
+        for session_id, session in list(self.sessions.items()):
+            if not session.busy and not session.pending and session.last_active < cutoff:
+                del self.sessions[session_id]
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._ready:
+                # Pick the session only once a slot is free, so the choice is round-robin at that moment
+                await self._slots.acquire()
+                session = self.sessions[self._ready.popleft()]
+                session.busy = True
+                user_input, reply, future = session.pending.popleft()
+                asyncio.create_task(self._serve(session, user_input, reply, future), name=f"session-{session.id}")
+
+    async def _serve(self, session: Session, user_input: str, reply: Optional[Reply], future: asyncio.Future) -> None:
+        started = time.perf_counter()
+        try:
+            response = await self._run_turn(session, user_input)
+            session.memory.add(user_input, response)
+            if reply is not None:
+                await reply(response)
+            future.set_result(response)
+        except Exception as e:
+            logger.error(f"Error in session {session.id}: {e}")
+            if reply is None:
+                future.set_exception(e)
+            else:
+                # Nobody awaits the future when there is a reply callback; tell the requester instead
+                try:
+                    await reply(f"Sorry, I couldn't complete that request: {e}")
+                except Exception as reply_error:
+                    logger.error(f"Could not report the error to session {session.id}: {reply_error}")
+                future.set_result(None)
+        finally:
+            logger.info(f"Session {session.id} turn took {time.perf_counter() - started:.1f}s")
+            session.busy = False
+            session.last_active = time.monotonic()
+            self._slots.release()
+            self._mark_ready(session)
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from langchain_core.tools import StructuredTool
+
+from coral_runtime import find_tool
+from responses import MentionRouter, ResponseAggregator, parse_thread_id
+
+logger = logging.getLogger(__name__)
+
+
+class TaskSpec(BaseModel):
+    id: str = Field(..., description="Short unique task id, e.g. 'scrape'")
+    agent_id: str = Field(..., description="ID of the agent that performs the task (from the connected agents list)")
+    instruction: str = Field(..., description="Clear, self-contained instruction for that agent, including the expected output format")
+    depends_on: List[str] = Field(default_factory=list, description="Ids of tasks whose outputs this task needs")
+    timeout_sec: Optional[float] = Field(None, description="How long to wait for the agent's reply")
+
+
+class TaskGraphArgs(BaseModel):
+    tasks: List[TaskSpec] = Field(..., min_length=1, description="The plan: one entry per agent request")
+    thread_name: str = Field("user_request", description="Name of the Coral thread created for this plan")
+
+
+def _validate(tasks: List[TaskSpec]) -> Optional[str]:
+    ids = [t.id for t in tasks]
+    if len(set(ids)) != len(ids):
+        return "task ids must be unique"
+    known = set(ids)
+    for t in tasks:
+        missing = [d for d in t.depends_on if d not in known]
+        if missing:
+            return f"task '{t.id}' depends on unknown task(s) {missing}"
+    # Kahn's algorithm: anything left over is part of a cycle
+    indegree = {t.id: len(set(t.depends_on)) for t in tasks}
+    ready = [i for i, n in indegree.items() if n == 0]
+    seen = 0
+    while ready:
+        current = ready.pop()
+        seen += 1
+        for t in tasks:
+            if current in t.depends_on:
+                indegree[t.id] -= 1
+                if indegree[t.id] == 0:
+                    ready.append(t.id)
+    if seen != len(tasks):
+        return "task graph has a cycle"
+    return None
+
+
+class TaskGraphRunner:
+    """Runs a delegation plan as a DAG over Coral: every task whose inputs are
+    ready is sent at once, dependents get their upstream outputs appended to the
+    instruction, and replies are collected by a ResponseAggregator on the thread."""
+
+    def __init__(self, coral_tools: List[Any], self_id: Optional[str], router: MentionRouter):
+        self._create_thread = find_tool(coral_tools, "create_thread")
+        self._send_message = find_tool(coral_tools, "send_message")
+        if not (self._create_thread and self._send_message):
+            raise ValueError("Coral tools create_thread and send_message are required")
+        self._self_id = self_id
+        self.router = router
+
+    async def open_thread(self, name: str, agent_ids: List[str]) -> str:
+        participants = list(dict.fromkeys(agent_ids + ([self._self_id] if self._self_id else [])))
+        raw = await self._create_thread.ainvoke({"threadName": name, "participantIds": participants})
+        thread_id = parse_thread_id(raw)
+        if not thread_id:
+            raise RuntimeError(f"could not read thread id from create_thread result: {raw}")
+        self.router.claim_thread(thread_id)
+        return thread_id
+
+    async def run(self, tasks: List[TaskSpec], thread_name: str = "user_request") -> Dict[str, Any]:
+        tasks = [t if isinstance(t, TaskSpec) else TaskSpec(**t) for t in tasks]
+        error = _validate(tasks)
+        if error:
+            return {"status": "error", "error": error}
+
+        started = time.perf_counter()
+        thread_id = await self.open_thread(thread_name, [t.agent_id for t in tasks])
+        logger.info(f"Running task graph of {len(tasks)} tasks in thread {thread_id}")
+        aggregator = ResponseAggregator(self.router, thread_id)
+        results: Dict[str, Dict[str, Any]] = {}
+        running: Dict[str, asyncio.Task] = {}
+
+        async def run_task(task: TaskSpec) -> None:
+            upstream = [running[d] for d in task.depends_on]
+            if upstream:
+                await asyncio.gather(*upstream)
+            failed = [d for d in task.depends_on if results[d]["status"] != "ok"]
+            if failed:
+                results[task.id] = {"agent_id": task.agent_id, "status": "skipped", "output": f"dependencies failed: {failed}"}
+                return
+            content = task.instruction
+            for d in task.depends_on:
+                content += f"\n\nOutput from task '{d}' ({results[d]['agent_id']}):\n{results[d]['output']}"
+            # Listen before sending so a fast reply can't arrive ahead of its waiter
+            aggregator.expect(task.agent_id, task.timeout_sec, key=task.id)
+            try:
+                await self._send_message.ainvoke({"threadId": thread_id, "content": content, "mentions": [task.agent_id]})
+            except Exception as e:
+                aggregator.cancel(task.id, f"send_message failed: {e}")
+            results[task.id] = await aggregator.response(task.id)
+
+        for task in tasks:
+            running[task.id] = asyncio.create_task(run_task(task), name=f"task-{task.id}")
+        await asyncio.gather(*running.values())
+
+        return {
+            "status": "ok" if all(r["status"] == "ok" for r in results.values()) else "partial",
+            "thread_id": thread_id,
+            "elapsed_sec": round(time.perf_counter() - started, 1),
+            "results": {t.id: results[t.id] for t in tasks},
+        }
+
+
+def get_task_graph_tool(runner: TaskGraphRunner) -> StructuredTool:
+    async def run_task_graph(tasks: List[TaskSpec], thread_name: str = "user_request") -> str:
+        return json.dumps(await runner.run(tasks, thread_name))
+
+    return StructuredTool.from_function(
+        coroutine=run_task_graph,
+        name="run_task_graph",
+        description=(
+            "Execute a delegation plan in one call. Pass every agent request as a task "
+            "{id, agent_id, instruction, depends_on}. A thread with all agents is created, independent tasks "
+            "are sent at the same time, tasks with depends_on wait for those tasks and receive their outputs, "
+            "and all replies are returned together as JSON keyed by task id."
+        ),
+        args_schema=TaskGraphArgs,
+    )
@@ -17,6 +17,21 @@ class Settings:
     elevenlabs_voice_id: str | None
     product_holding_model: str | None
     product_holding_extra_args: dict[str, Any]
+    cache_dir: str
+    state_db: str
+    tts_cache_max_bytes: int
+    fal_url_ttl_sec: float
+    product_holding_cache_ttl_sec: float
+    webhook_public_url: str | None
+    webhook_port: int
+    webhook_secret: str | None
+    fal_concurrency: int
+    elevenlabs_concurrency: int
+    batch_max_items: int
+    tts_chunk_chars: int
+    render_deadline_sec: float
+    preprocess_media: bool
+    prep_workers: int
 
 
 def get_settings() -> Settings:
@@ -30,12 +45,38 @@ def get_settings() -> Settings:
         except json.JSONDecodeError:
             pass
 
+    # FAL storage URLs are not kept forever; don't hand out remembered URLs past this age
+    fal_url_ttl_sec = float(os.getenv("FAL_URL_TTL_SEC", str(7 * 24 * 3600)))
+
+    cache_dir = os.getenv("VIDEO_CACHE_DIR", os.path.expanduser("~/.cache/coral-video-agent"))
+
     return Settings(
         fal_key=os.getenv("FAL_KEY"),
         elevenlabs_api_key=os.getenv("ELEVENLABS_API_KEY"),
         elevenlabs_voice_id=os.getenv("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM"),
         product_holding_model=os.getenv("PRODUCT_HOLDING_MODEL", "fal-ai/image-apps-v2/product-holding"),
         product_holding_extra_args=extra_args,
+        cache_dir=cache_dir,
+        # Point replicas at the same file to share upload/composite dedup state
+        state_db=os.getenv("VIDEO_STATE_DB", os.path.join(cache_dir, "state.sqlite3")),
+        tts_cache_max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024),
+        fal_url_ttl_sec=fal_url_ttl_sec,
+        # Composites are FAL URLs too, so they can't outlive FAL_URL_TTL_SEC
+        product_holding_cache_ttl_sec=min(
+            float(os.getenv("PRODUCT_HOLDING_CACHE_TTL_SEC", str(fal_url_ttl_sec))),
+            fal_url_ttl_sec,
+        ),
+        webhook_public_url=os.getenv("VIDEO_WEBHOOK_PUBLIC_URL"),
+        webhook_port=int(os.getenv("VIDEO_WEBHOOK_PORT", "8089")),
+        # Path token FAL must echo back; derived from FAL_KEY when unset (see jobs._webhook_secret)
+        webhook_secret=os.getenv("VIDEO_WEBHOOK_SECRET") or None,
+        fal_concurrency=int(os.getenv("VIDEO_FAL_CONCURRENCY", "4")),
+        elevenlabs_concurrency=int(os.getenv("VIDEO_ELEVENLABS_CONCURRENCY", "2")),
+        batch_max_items=int(os.getenv("VIDEO_BATCH_MAX_ITEMS", "50")),
+        tts_chunk_chars=int(os.getenv("TTS_CHUNK_CHARS", "800")),
+        render_deadline_sec=float(os.getenv("VIDEO_RENDER_DEADLINE_SEC", "1200")),
+        preprocess_media=os.getenv("VIDEO_PREPROCESS_MEDIA", "1").lower() not in ("0", "false", "no"),
+        prep_workers=int(os.getenv("VIDEO_PREP_WORKERS", "2")),
     )
 
 
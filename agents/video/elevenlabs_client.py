@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import os
+import re
+import shutil
+import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from io import BytesIO
 from pathlib import Path
 from typing import Optional
 
 import requests
 
+from tts_cache import TTSCache
+
 ELEVEN_TTS_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
 
 
@@ -14,23 +23,40 @@ class ElevenLabsError(RuntimeError):
     pass
 
 
-def synthesize_speech_to_file(
+def resolve_voice_id(voice_id: Optional[str] = None) -> str:
+    return voice_id or os.getenv("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM")
+
+
+def _audio_suffix(output_format: str) -> str:
+    return ".mp3" if "mp3" in (output_format or "").lower() else ".audio"
+
+
+def audio_content_type(output_format: str) -> str:
+    fmt = (output_format or "").lower()
+    if fmt.startswith("mp3"):
+        return "audio/mpeg"
+    if fmt.startswith("pcm"):
+        return "audio/pcm"
+    if fmt.startswith("ulaw"):
+        return "audio/basic"
+    return "application/octet-stream"
+
+
+def _stream_tts(
     text: str,
     api_key: str,
-    voice_id: Optional[str] = None,
-    output_format: str = "mp3_44100_128",
-    model_id: str = "eleven_multilingual_v2",
-) -> Path:
-    if not api_key:
-        raise ElevenLabsError("Missing ELEVENLABS_API_KEY")
-
-    voice = voice_id or os.getenv("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM")
+    voice: str,
+    output_format: str,
+    model_id: str,
+    previous_text: Optional[str] = None,
+    next_text: Optional[str] = None,
+) -> BytesIO:
     url = ELEVEN_TTS_URL.format(voice_id=voice)
 
     headers = {
         "xi-api-key": api_key,
         "Content-Type": "application/json",
-        "Accept": "audio/mpeg",
+        "Accept": audio_content_type(output_format),
     }
 
     params = {"output_format": output_format}
@@ -39,21 +65,258 @@ def synthesize_speech_to_file(
         "model_id": model_id,
         "voice_settings": {"stability": 0.5, "similarity_boost": 0.75},
     }
+    # Neighbouring text only steers prosody at chunk boundaries
+    if previous_text:
+        payload["previous_text"] = previous_text
+    if next_text:
+        payload["next_text"] = next_text
 
     resp = requests.post(url, headers=headers, params=params, json=payload, stream=True, timeout=60)
-    if resp.status_code != 200:
-        try:
-            detail = resp.json()
-        except Exception:
-            detail = resp.text
-        raise ElevenLabsError(f"ElevenLabs TTS failed ({resp.status_code}): {detail}")
+    with resp:
+        if resp.status_code != 200:
+            try:
+                detail = resp.json()
+            except Exception:
+                detail = resp.text
+            raise ElevenLabsError(f"ElevenLabs TTS failed ({resp.status_code}): {detail}")
 
-    suffix = ".mp3" if "mp3" in (output_format or "").lower() else ".audio"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as fp:
+        buf = BytesIO()
         for chunk in resp.iter_content(chunk_size=8192):
             if chunk:
-                fp.write(chunk)
-        tmp_path = Path(fp.name)
+                buf.write(chunk)
+    return buf
+
+
+def synthesize_speech(
+    text: str,
+    api_key: str,
+    voice_id: Optional[str] = None,
+    output_format: str = "mp3_44100_128",
+    model_id: str = "eleven_multilingual_v2",
+    cache: Optional[TTSCache] = None,
+    previous_text: Optional[str] = None,
+    next_text: Optional[str] = None,
+) -> bytes:
+    """Synthesize `text` and return the audio bytes without touching a temp file.
+
+    With a `cache`, identical (text, voice, model, format) requests are served
+    from the cache and new clips are added to it.
+    """
+    if not api_key:
+        raise ElevenLabsError("Missing ELEVENLABS_API_KEY")
+
+    voice = resolve_voice_id(voice_id)
+    key = TTSCache.key_for(text, voice, model_id, output_format)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            print(f"[elevenlabs] cache hit {key[:12]} -> {hit.path}", flush=True)
+            return hit.path.read_bytes()
+
+    data = _stream_tts(text, api_key, voice, output_format, model_id, previous_text, next_text).getvalue()
+    if cache is not None:
+        cache.put(key, data, _audio_suffix(output_format))
+    return data
+
+
+# The whitespace after a sentence end, optionally after closing quotes/brackets,
+# which stay with their sentence
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"')\]])|(?<=[.!?…][\"')\]]{2}))\s+")
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """Split `text` at sentence boundaries into chunks of at most `max_chars`.
+
+    Chunks never span paragraphs, so an edit to one paragraph leaves the
+    chunks (and cache keys) of the others unchanged. Sentences longer than
+    `max_chars` are split at whitespace. Closing quotes and brackets stay with
+    their sentence:
+
+    >>> split_text('She said "Buy now." Then left. (Really!) OK.', 20)
+    ['She said "Buy now."', 'Then left. (Really!)', 'OK.']
+    """
+    chunks: list[str] = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        current = ""
+        for sentence in _SENTENCE_END.split(paragraph.strip()):
+            sentence = " ".join(sentence.split())
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+            if not sentence:
+                continue
+            if current and len(current) + 1 + len(sentence) <= max_chars:
+                current = f"{current} {sentence}"
+            else:
+                if current:
+                    chunks.append(current)
+                current = sentence
+        if current:
+            chunks.append(current)
+    return chunks
 
-    return tmp_path
 
+def _mp3_frame_length(header: bytes) -> Optional[int]:
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03  # 3: MPEG1, 2: MPEG2, 0: MPEG2.5
+    layer = (header[1] >> 1) & 0x03
+    bitrate_idx = header[2] >> 4
+    rate_idx = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if layer != 1 or version == 1 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None  # only Layer III, which is what ElevenLabs returns
+    if version == 3:
+        bitrate = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)[bitrate_idx]
+        sample_rate = (44100, 48000, 32000)[rate_idx]
+        return 144 * bitrate * 1000 // sample_rate + padding
+    bitrate = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)[bitrate_idx]
+    sample_rate = (22050, 24000, 16000)[rate_idx] // (1 if version == 2 else 2)
+    return 72 * bitrate * 1000 // sample_rate + padding
+
+
+def _strip_mp3_container(data: bytes) -> bytes:
+    """Drop ID3 tags and the Xing/Info frame so MP3 chunks concatenate into one stream."""
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        data = data[10 + size:]
+    if len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    frame_len = _mp3_frame_length(data[:4])
+    if frame_len and any(tag in data[:frame_len] for tag in (b"Xing", b"Info", b"VBRI")):
+        data = data[frame_len:]
+    return data
+
+
+def _concat_mp3_frames(chunks: list[bytes]) -> bytes:
+    """Join MP3 chunks frame by frame after stripping per-file headers.
+
+    Each chunk keeps its encoder delay and padding, so every join has a short
+    gap (a few dozen ms); `join_audio` only uses this without ffmpeg.
+
+    >>> frame = bytes([0xFF, 0xFB, 0x90, 0x00]) + bytes(413)
+    >>> info = bytes([0xFF, 0xFB, 0x90, 0x00]) + b"Info" + bytes(409)
+    >>> chunk = b"ID3" + bytes([4, 0, 0, 0, 0, 0, 2]) + bytes(2) + info + frame * 2
+    >>> _concat_mp3_frames([chunk, chunk, chunk]) == frame * 6
+    True
+    """
+    return b"".join(_strip_mp3_container(c) for c in chunks)
+
+
+def _decode_concat_mp3(chunks: list[bytes], output_format: str) -> bytes:
+    """Decode every chunk, concatenate the samples and re-encode, so joins are gapless."""
+    # e.g. mp3_44100_128 -> 128k
+    bitrate = output_format.split("_")[-1] if output_format.count("_") == 2 else "128"
+    with tempfile.TemporaryDirectory(prefix="tts-join-") as tmp:
+        inputs: list[str] = []
+        for i, chunk in enumerate(chunks):
+            path = Path(tmp) / f"{i}.mp3"
+            path.write_bytes(chunk)
+            inputs += ["-i", str(path)]
+        streams = "".join(f"[{i}:a]" for i in range(len(chunks)))
+        proc = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error", *inputs,
+                "-filter_complex", f"{streams}concat=n={len(chunks)}:v=0:a=1",
+                "-map_metadata", "-1", "-c:a", "libmp3lame", "-b:a", f"{bitrate}k",
+                "-f", "mp3", "pipe:1",
+            ],
+            capture_output=True,
+            timeout=300,
+        )
+    if proc.returncode != 0 or not proc.stdout:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.decode(errors='replace')[:500]}")
+    return proc.stdout
+
+
+def join_audio(chunks: list[bytes], output_format: str) -> bytes:
+    """Concatenate clips of the same `output_format` into one clip.
+
+    Raw PCM/µ-law chunks join sample-exactly. MP3 chunks are decoded and
+    re-encoded as one stream with ffmpeg, which drops each chunk's encoder
+    delay and padding. Without ffmpeg (or if it fails) they are joined frame
+    by frame, and each join keeps a short gap.
+    """
+    if not (output_format or "").lower().startswith("mp3"):
+        return b"".join(chunks)
+    if len(chunks) > 1 and shutil.which("ffmpeg"):
+        try:
+            return _decode_concat_mp3(chunks, output_format)
+        except Exception as e:
+            print(f"[elevenlabs] gapless join failed, joining frames instead: {e}", flush=True)
+    return _concat_mp3_frames(chunks)
+
+
+def synthesize_long_speech(
+    text: str,
+    api_key: str,
+    voice_id: Optional[str] = None,
+    output_format: str = "mp3_44100_128",
+    model_id: str = "eleven_multilingual_v2",
+    cache: Optional[TTSCache] = None,
+    max_chars: int = 800,
+    concurrency: int = 2,
+    slots: Optional[threading.Semaphore] = None,
+) -> bytes:
+    """Synthesize long `text` as sentence-aligned chunks in parallel and join them.
+
+    Each chunk is cached on its own text, so editing one paragraph only
+    re-synthesizes the chunks it touches. Pass the process-wide `slots`
+    semaphore to bound ElevenLabs calls across concurrent callers; otherwise
+    only this call's chunks are bounded, by `concurrency`.
+    """
+    chunks = split_text(text, max_chars)
+    if len(chunks) <= 1:
+        with slots if slots is not None else nullcontext():
+            return synthesize_speech(text, api_key, voice_id, output_format, model_id, cache)
+
+    voice = resolve_voice_id(voice_id)
+    key = TTSCache.key_for(text, voice, model_id, output_format)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            print(f"[elevenlabs] cache hit {key[:12]} -> {hit.path}", flush=True)
+            return hit.path.read_bytes()
+
+    print(f"[elevenlabs] long-form: {len(text)} chars -> {len(chunks)} chunks (concurrency={concurrency})", flush=True)
+
+    def one(i: int) -> bytes:
+        with slots if slots is not None else nullcontext():
+            return synthesize_speech(
+                chunks[i],
+                api_key,
+                voice,
+                output_format,
+                model_id,
+                cache,
+                previous_text=chunks[i - 1] if i > 0 else None,
+                next_text=chunks[i + 1] if i + 1 < len(chunks) else None,
+            )
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        parts = list(pool.map(one, range(len(chunks))))
+    data = join_audio(parts, output_format)
+    if cache is not None:
+        # Stored under the full-text key too, so the uploaded URL can be remembered
+        cache.put(key, data, _audio_suffix(output_format))
+    return data
+
+
+def synthesize_speech_to_file(
+    text: str,
+    api_key: str,
+    voice_id: Optional[str] = None,
+    output_format: str = "mp3_44100_128",
+    model_id: str = "eleven_multilingual_v2",
+    cache: Optional[TTSCache] = None,
+) -> Path:
+    """Like `synthesize_speech`, but writes a temp file the caller must delete."""
+    data = synthesize_speech(text, api_key, voice_id, output_format, model_id, cache)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=_audio_suffix(output_format)) as fp:
+        fp.write(data)
+    return Path(fp.name)
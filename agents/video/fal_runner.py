@@ -1,26 +1,117 @@
 from __future__ import annotations
 
 from pathlib import Path
+import asyncio
 import base64
+import hashlib
+import mimetypes
 import os
-import tempfile
-from typing import Any, Optional, Tuple
+from typing import Any, Callable, Optional, Tuple
 
 import fal_client
+import requests
+
+from config import get_settings
+from media_prep import PrepReport, prepare_image
+from jobs import get_job_registry, get_webhook_url
+from kv_store import get_store, hash_key
 
 
 DEFAULT_PRODUCT_HOLDING_PROMPT = "Blend the product naturally into the scene without making it the main focus."
 
 
-def upload_file_to_fal(path: str) -> str:
-    print(f"[fal_runner] uploading file to FAL: {path}", flush=True)
-    url = fal_client.upload_file(path)
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dedup_upload(content_hash: str, content_type: str, upload: Callable[[], str]) -> str:
+    """Return the remembered FAL URL for identical content, uploading only on a miss."""
+    ttl = get_settings().fal_url_ttl_sec
+    key = f"{content_hash}:{content_type}"
+    store = get_store("fal_uploads") if ttl > 0 else None
+    if store is not None:
+        cached = store.get(key)
+        if cached:
+            print(f"[fal_runner] upload dedup hit {content_hash[:12]} -> {cached}", flush=True)
+            return cached
+
+    url = upload()
     if not url:
-        raise RuntimeError("FAL file upload returned empty URL")
-    print(f"[fal_runner] uploaded file url: {url}", flush=True)
+        raise RuntimeError("FAL upload returned empty URL")
+    if store is not None:
+        store.set(key, url, ttl_sec=ttl)
     return url
 
 
+def upload_file_to_fal(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    def upload() -> str:
+        print(f"[fal_runner] uploading file to FAL: {path}", flush=True)
+        url = fal_client.upload_file(path)
+        print(f"[fal_runner] uploaded file url: {url}", flush=True)
+        return url
+
+    return _dedup_upload(_file_sha256(path), content_type, upload)
+
+
+def upload_bytes_to_fal(data: bytes, content_type: str, file_name: Optional[str] = None) -> str:
+    """Upload an in-memory blob straight to FAL storage (no temp file)."""
+
+    def upload() -> str:
+        print(f"[fal_runner] uploading {len(data)} bytes ({content_type}) to FAL", flush=True)
+        url = fal_client.upload(data, content_type, file_name=file_name)
+        print(f"[fal_runner] uploaded blob url: {url}", flush=True)
+        return url
+
+    return _dedup_upload(hashlib.sha256(data).hexdigest(), content_type, upload)
+
+
+def prepare_image_url(url: str, resolution: str, report: Optional[PrepReport] = None) -> str:
+    """Return a FAL URL for `url` normalized to `resolution` (see media_prep).
+
+    The mapping is remembered for FAL_URL_TTL_SEC, so each source image is
+    downloaded and processed once. Returns `url` unchanged when preprocessing
+    is disabled or fails.
+    """
+    settings = get_settings()
+    if not settings.preprocess_media:
+        return url
+    key = hash_key(url, resolution)
+    store = get_store("prepared_images")
+    cached = store.get(key)
+    if cached:
+        return cached
+    try:
+        resp = requests.get(url, timeout=30)
+        resp.raise_for_status()
+        data, content_type = prepare_image(resp.content, resolution, report)
+        if content_type is None:
+            prepared = url
+        else:
+            prepared = upload_bytes_to_fal(
+                data, content_type, file_name=f"prepared{mimetypes.guess_extension(content_type) or ''}"
+            )
+    except Exception as e:
+        print(f"[fal_runner] image preprocessing skipped for {url}: {e}", flush=True)
+        return url
+    store.set(key, prepared, ttl_sec=settings.fal_url_ttl_sec)
+    return prepared
+
+
+def upload_image_file_to_fal(path: str, resolution: str, report: Optional[PrepReport] = None) -> str:
+    """Normalize a local image for `resolution` and upload it."""
+    with open(path, "rb") as fp:
+        data, content_type = prepare_image(fp.read(), resolution, report)
+    if content_type is None:
+        return upload_file_to_fal(path)
+    return upload_bytes_to_fal(data, content_type, file_name=f"{Path(path).stem}{mimetypes.guess_extension(content_type) or ''}")
+
+
 _STATIC_ASSET_URL_CACHE: dict[str, str] = {}
 
 
@@ -143,40 +234,36 @@ def _extract_image_artifacts(payload: Any) -> Tuple[Optional[str], Optional[Tupl
     return None, None, None
 
 
-def _save_bytes_to_temp(data: bytes, suffix: str) -> Path:
-    fd, tmp_path = tempfile.mkstemp(suffix=suffix)
-    with os.fdopen(fd, "wb") as fp:
-        fp.write(data)
-    return Path(tmp_path)
+FABRIC_MODEL = "veed/fabric-1.0"
 
 
-def run_product_holding(
-    *,
-    model_id: Optional[str] = None,
-    model_image_path: Optional[str | Path] = None,
-    product_image_path: Optional[str | Path] = None,
-    person_image_url: Optional[str] = None,
-    product_image_url: Optional[str] = None,
-    extra_arguments: Optional[dict[str, Any]] = None,
-    wait: bool = True,
-) -> dict[str, Any]:
+def _prepare_product_holding(
+    model_id: Optional[str],
+    model_image_path: Optional[str | Path],
+    product_image_path: Optional[str | Path],
+    person_image_url: Optional[str],
+    product_image_url: Optional[str],
+    extra_arguments: Optional[dict[str, Any]],
+    resolution: str,
+    report: Optional[PrepReport],
+) -> tuple[str, str, str, dict[str, Any]]:
     model_name = model_id or os.getenv("PRODUCT_HOLDING_MODEL", "fal-ai/image-apps-v2/product-holding")
     if not model_name:
         raise RuntimeError("Product Holding model is not configured; set PRODUCT_HOLDING_MODEL")
 
     # Handle person image - prioritize URL over path
     if person_image_url:
-        person_url = person_image_url
+        person_url = prepare_image_url(person_image_url, resolution, report)
     elif model_image_path:
-        person_url = upload_file_to_fal(str(model_image_path))
+        person_url = upload_image_file_to_fal(str(model_image_path), resolution, report)
     else:
         person_url = get_hardcoded_image_url()
 
     # Handle product image - prioritize URL over path
     if product_image_url:
-        product_url = product_image_url
+        product_url = prepare_image_url(product_image_url, resolution, report)
     elif product_image_path:
-        product_url = upload_file_to_fal(str(product_image_path))
+        product_url = upload_image_file_to_fal(str(product_image_path), resolution, report)
     else:
         product_url = get_product_image_url()
 
@@ -196,38 +283,38 @@ def run_product_holding(
         arguments.update(merged)
 
     arguments.setdefault("prompt", prompt)
+    return model_name, person_url, product_url, arguments
 
-    print(
-        f"[fal_runner] run_product_holding(model={model_name}, person_url={person_url}, product_url={product_url}, wait={wait})",
-        flush=True,
-    )
 
-    if wait:
-        def on_queue_update(update):
-            if isinstance(update, fal_client.InProgress):
-                for log in getattr(update, "logs", []) or []:
-                    print(f"[fal_runner] product holding log: {log.get('message', '')}", flush=True)
+def _cached_product_holding(
+    model_name: str,
+    arguments: dict[str, Any],
+    person_url: str,
+    product_url: str,
+) -> Optional[dict[str, Any]]:
+    if get_settings().product_holding_cache_ttl_sec <= 0:
+        return None
+    cache_key = hash_key(model_name, arguments)
+    cached = get_store("product_holding").get(cache_key)
+    if not cached or not cached.get("image_url"):
+        return None
+    print(f"[fal_runner] run_product_holding cache hit {cache_key[:12]} -> {cached['image_url']}", flush=True)
+    return {
+        **cached,
+        "source_local_path": None,
+        "model_image_url": person_url,
+        "product_image_url": product_url,
+        "cached": True,
+    }
 
-        result = fal_client.subscribe(
-            model_name,
-            arguments=arguments,
-            with_logs=True,
-            on_queue_update=on_queue_update,
-        )
-    else:
-        handler = fal_client.submit(
-            model_name,
-            arguments=arguments,
-            webhook_url=None,
-        )
-        rid = handler.request_id
-        print(f"[fal_runner] run_product_holding submitted request_id={rid}", flush=True)
-        return {
-            "request_id": rid,
-            "model_image_url": person_url,
-            "product_image_url": product_url,
-        }
 
+def _finish_product_holding(
+    result: Any,
+    model_name: str,
+    arguments: dict[str, Any],
+    person_url: str,
+    product_url: str,
+) -> dict[str, Any]:
     print(
         f"[fal_runner] run_product_holding result keys: {list((result or {}).keys())}",
         flush=True,
@@ -248,21 +335,25 @@ def run_product_holding(
                         urls.append(i_url)
 
     uploaded_url: Optional[str] = urls[0] if urls else None
-    temp_path: Optional[Path] = None
 
     if not uploaded_url and blob:
         data, mime = blob
-        temp_path = _save_bytes_to_temp(data, _mime_to_extension(mime))
-        uploaded_url = upload_file_to_fal(str(temp_path))
+        uploaded_url = upload_bytes_to_fal(
+            data,
+            mime or "image/png",
+            file_name=f"product-holding{_mime_to_extension(mime)}",
+        )
 
     elif not uploaded_url and local_path:
         uploaded_url = upload_file_to_fal(local_path)
 
-    if temp_path is not None:
-        try:
-            temp_path.unlink(missing_ok=True)
-        except Exception:
-            pass
+    cache_ttl = get_settings().product_holding_cache_ttl_sec
+    if uploaded_url and cache_ttl > 0:
+        get_store("product_holding").set(
+            hash_key(model_name, arguments),
+            {"image_url": uploaded_url, "source_image_url": url, "raw_result": result},
+            ttl_sec=cache_ttl,
+        )
 
     return {
         "image_url": uploaded_url,
@@ -274,6 +365,67 @@ def run_product_holding(
     }
 
 
+def run_product_holding(
+    *,
+    model_id: Optional[str] = None,
+    model_image_path: Optional[str | Path] = None,
+    product_image_path: Optional[str | Path] = None,
+    person_image_url: Optional[str] = None,
+    product_image_url: Optional[str] = None,
+    extra_arguments: Optional[dict[str, Any]] = None,
+    wait: bool = True,
+    resolution: str = "720p",
+    report: Optional[PrepReport] = None,
+) -> dict[str, Any]:
+    model_name, person_url, product_url, arguments = _prepare_product_holding(
+        model_id, model_image_path, product_image_path, person_image_url, product_image_url, extra_arguments,
+        resolution, report,
+    )
+
+    print(
+        f"[fal_runner] run_product_holding(model={model_name}, person_url={person_url}, product_url={product_url}, wait={wait})",
+        flush=True,
+    )
+
+    if wait:
+        cached = _cached_product_holding(model_name, arguments, person_url, product_url)
+        if cached:
+            return cached
+
+        def on_queue_update(update):
+            if isinstance(update, fal_client.InProgress):
+                for log in getattr(update, "logs", []) or []:
+                    print(f"[fal_runner] product holding log: {log.get('message', '')}", flush=True)
+
+        result = fal_client.subscribe(
+            model_name,
+            arguments=arguments,
+            with_logs=True,
+            on_queue_update=on_queue_update,
+        )
+    else:
+        handler = fal_client.submit(
+            model_name,
+            arguments=arguments,
+            webhook_url=get_webhook_url(),
+        )
+        rid = handler.request_id
+        print(f"[fal_runner] run_product_holding submitted request_id={rid}", flush=True)
+        get_job_registry().register(
+            rid,
+            app=model_name,
+            kind="product_holding",
+            meta={"model_image_url": person_url, "product_image_url": product_url},
+        )
+        return {
+            "request_id": rid,
+            "model_image_url": person_url,
+            "product_image_url": product_url,
+        }
+
+    return _finish_product_holding(result, model_name, arguments, person_url, product_url)
+
+
 def run_fabric(
     image_url: str,
     audio_url: str,
@@ -288,7 +440,7 @@ def run_fabric(
                     print(f"[fal_runner] fal log: {log.get('message', '')}", flush=True)
 
         result = fal_client.subscribe(
-            "veed/fabric-1.0",
+            FABRIC_MODEL,
             arguments={
                 "image_url": image_url,
                 "audio_url": audio_url,
@@ -301,14 +453,130 @@ def run_fabric(
         return result or {}
 
     handler = fal_client.submit(
-        "veed/fabric-1.0",
+        FABRIC_MODEL,
         arguments={
             "image_url": image_url,
             "audio_url": audio_url,
             "resolution": resolution,
         },
-        webhook_url=None,
+        webhook_url=get_webhook_url(),
     )
     rid = handler.request_id
     print(f"[fal_runner] submitted request_id={rid}", flush=True)
+    get_job_registry().register(
+        rid,
+        app=FABRIC_MODEL,
+        kind="fabric",
+        meta={"image_url": image_url, "audio_url": audio_url, "resolution": resolution},
+    )
     return {"request_id": rid}
+
+
+# ---------------------
+# asyncio variants
+# ---------------------
+
+ProgressCallback = Callable[[str, Any], None]
+
+
+async def _run_async(
+    app: str,
+    arguments: dict[str, Any],
+    *,
+    kind: str,
+    meta: dict[str, Any],
+    deadline_sec: Optional[float],
+    on_progress: Optional[ProgressCallback],
+) -> Any:
+    """Submit to the FAL queue and await the result without pinning a thread.
+
+    The job is registered in the job registry. If the caller is cancelled or
+    `deadline_sec` elapses, the FAL request is cancelled as well.
+    """
+    handle = await fal_client.submit_async(app, arguments=arguments, webhook_url=get_webhook_url())
+    rid = handle.request_id
+    print(f"[fal_runner] {kind} submitted request_id={rid} (async)", flush=True)
+    registry = get_job_registry()
+    registry.register(rid, app=app, kind=kind, meta=meta)
+    try:
+        async with asyncio.timeout(deadline_sec):
+            async for event in handle.iter_events(with_logs=True, interval=0.5):
+                if isinstance(event, fal_client.InProgress):
+                    for log in event.logs or []:
+                        print(f"[fal_runner] {kind} log: {log.get('message', '')}", flush=True)
+                if on_progress is not None:
+                    on_progress(rid, event)
+            result = await handle.get()
+    except (asyncio.CancelledError, TimeoutError) as e:
+        reason = "deadline exceeded" if isinstance(e, TimeoutError) else "cancelled"
+        print(f"[fal_runner] {kind} {rid} {reason}; cancelling FAL request", flush=True)
+        try:
+            await asyncio.shield(handle.cancel())
+        except Exception as cancel_err:
+            print(f"[fal_runner] cancel of {rid} failed: {cancel_err}", flush=True)
+        registry.update(rid, "cancelled", error=reason)
+        raise
+    except Exception as e:
+        registry.update(rid, "failed", error=str(e))
+        raise
+    registry.update(rid, "completed", result=result)
+    return result
+
+
+async def run_product_holding_async(
+    *,
+    model_id: Optional[str] = None,
+    model_image_path: Optional[str | Path] = None,
+    product_image_path: Optional[str | Path] = None,
+    person_image_url: Optional[str] = None,
+    product_image_url: Optional[str] = None,
+    extra_arguments: Optional[dict[str, Any]] = None,
+    deadline_sec: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    resolution: str = "720p",
+    report: Optional[PrepReport] = None,
+) -> dict[str, Any]:
+    model_name, person_url, product_url, arguments = await asyncio.to_thread(
+        _prepare_product_holding,
+        model_id, model_image_path, product_image_path, person_image_url, product_image_url, extra_arguments,
+        resolution, report,
+    )
+    print(
+        f"[fal_runner] run_product_holding_async(model={model_name}, person_url={person_url}, product_url={product_url})",
+        flush=True,
+    )
+    cached = await asyncio.to_thread(_cached_product_holding, model_name, arguments, person_url, product_url)
+    if cached:
+        return cached
+
+    result = await _run_async(
+        model_name,
+        arguments,
+        kind="product_holding",
+        meta={"model_image_url": person_url, "product_image_url": product_url},
+        deadline_sec=deadline_sec,
+        on_progress=on_progress,
+    )
+    return await asyncio.to_thread(_finish_product_holding, result, model_name, arguments, person_url, product_url)
+
+
+async def run_fabric_async(
+    image_url: str,
+    audio_url: str,
+    resolution: str = "480p",
+    *,
+    deadline_sec: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> dict:
+    print(f"[fal_runner] run_fabric_async(image_url={image_url}, audio_url={audio_url}, resolution={resolution})", flush=True)
+    arguments = {"image_url": image_url, "audio_url": audio_url, "resolution": resolution}
+    result = await _run_async(
+        FABRIC_MODEL,
+        arguments,
+        kind="fabric",
+        meta=arguments,
+        deadline_sec=deadline_sec,
+        on_progress=on_progress,
+    )
+    print(f"[fal_runner] run_fabric_async result keys: {list((result or {}).keys())}", flush=True)
+    return result or {}
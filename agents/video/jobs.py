@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, Optional
+
+import fal_client
+
+from config import get_settings
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _extract_output_url(kind: str, result: Any) -> Optional[str]:
+    if not isinstance(result, dict):
+        return None
+    if kind == "fabric":
+        return (result.get("video") or {}).get("url")
+    image = result.get("image")
+    if isinstance(image, dict) and image.get("url"):
+        return image["url"]
+    images = result.get("images")
+    if isinstance(images, (list, tuple)) and images and isinstance(images[0], dict):
+        return images[0].get("url")
+    return result.get("image_url")
+
+
+class JobRegistry:
+    """SQLite-backed registry of FAL jobs submitted with wait=False.
+
+    Jobs are keyed by the FAL request_id. Status is updated either by polling
+    the FAL queue (`refresh`) or by FAL webhook callbacks (`apply_webhook`).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, app TEXT NOT NULL, kind TEXT NOT NULL,"
+                " status TEXT NOT NULL, output_url TEXT, result TEXT, error TEXT,"
+                " meta TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def register(self, job_id: str, app: str, kind: str, meta: Optional[dict[str, Any]] = None) -> None:
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, app, kind, status, meta, created_at, updated_at)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, app, kind, json.dumps(meta or {}, default=str), now, now),
+            )
+        print(f"[jobs] registered {kind} job {job_id} ({app})", flush=True)
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["meta"] = json.loads(job["meta"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Any = None,
+        error: Optional[str] = None,
+    ) -> None:
+        job = self.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return
+        output_url = _extract_output_url(job["kind"], result) if result is not None else None
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, output_url = COALESCE(?, output_url),"
+                " result = COALESCE(?, result), error = COALESCE(?, error), updated_at = ?"
+                " WHERE job_id = ?",
+                (
+                    status,
+                    output_url,
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+        print(f"[jobs] {job_id} -> {status}", flush=True)
+
+    def refresh(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Poll FAL for a non-terminal job and persist what it reports."""
+        job = self.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return job
+        try:
+            status = fal_client.status(job["app"], job_id, with_logs=False)
+            if isinstance(status, fal_client.Completed):
+                try:
+                    self.update(job_id, "completed", result=fal_client.result(job["app"], job_id))
+                except Exception as e:
+                    self.update(job_id, "failed", error=str(e))
+            elif isinstance(status, fal_client.InProgress):
+                self.update(job_id, "in_progress")
+            else:
+                self.update(job_id, "queued")
+        except Exception as e:
+            print(f"[jobs] status poll failed for {job_id}: {e}", flush=True)
+        return self.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[dict[str, Any]]:
+        job = self.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return job
+        fal_client.cancel(job["app"], job_id)
+        self.update(job_id, "cancelled")
+        return self.get(job_id)
+
+    def apply_webhook(self, payload: dict[str, Any]) -> bool:
+        """Apply a FAL webhook body ({request_id, status: OK|ERROR, payload, error})."""
+        job_id = payload.get("request_id")
+        if not job_id or self.get(job_id) is None:
+            return False
+        if payload.get("status") == "OK":
+            self.update(job_id, "completed", result=payload.get("payload"))
+        else:
+            detail = payload.get("error") or payload.get("payload_error") or payload.get("payload")
+            self.update(job_id, "failed", error=json.dumps(detail, default=str))
+        return True
+
+
+_REGISTRY: Optional[JobRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_job_registry() -> JobRegistry:
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = JobRegistry(get_settings().state_db)
+        return _REGISTRY
+
+
+_WEBHOOK_PATH = "/fal/webhook/"
+_GENERATED_SECRET: Optional[str] = None
+_MAX_WEBHOOK_BYTES = 1024 * 1024
+
+
+def _webhook_secret() -> str:
+    """VIDEO_WEBHOOK_SECRET, else a token derived from FAL_KEY so restarts and replicas agree."""
+    global _GENERATED_SECRET
+    settings = get_settings()
+    if settings.webhook_secret:
+        return settings.webhook_secret
+    if _GENERATED_SECRET is None:
+        if settings.fal_key:
+            digest = hmac.new(settings.fal_key.encode(), b"video-agent/fal-webhook", hashlib.sha256).digest()
+            _GENERATED_SECRET = base64.urlsafe_b64encode(digest[:24]).decode()
+        else:
+            _GENERATED_SECRET = secrets.token_urlsafe(24)
+            print(
+                "[jobs] VIDEO_WEBHOOK_SECRET and FAL_KEY are unset; using a per-process webhook token. "
+                "Jobs submitted before a restart or by another replica will fall back to polling.",
+                flush=True,
+            )
+    return _GENERATED_SECRET
+
+
+def get_webhook_url() -> Optional[str]:
+    """Public URL FAL should call on completion, if the webhook receiver is enabled.
+
+    The URL ends in a secret token, so only whoever was given the URL (FAL)
+    can report job results; anything else hitting the port is rejected.
+    """
+    base = get_settings().webhook_public_url
+    if not base:
+        return None
+    return base.rstrip("/") + _WEBHOOK_PATH + _webhook_secret()
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        path = self.path.split("?", 1)[0]
+        token = path[len(_WEBHOOK_PATH):] if path.startswith(_WEBHOOK_PATH) else ""
+        if not token or not hmac.compare_digest(token.encode(), _webhook_secret().encode()):
+            self.send_response(404)
+            self.end_headers()
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > _MAX_WEBHOOK_BYTES:
+                raise ValueError(f"body too large ({length} bytes)")
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            known = get_job_registry().apply_webhook(payload)
+            self.send_response(200 if known else 202)
+        except Exception as e:
+            print(f"[jobs] webhook handling failed: {e}", flush=True)
+            self.send_response(400)
+        self.end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # The request line carries the secret token; keep it out of the logs
+        message = (format % args).replace(_webhook_secret(), "***")
+        print(f"[jobs] webhook {self.address_string()} {message}", flush=True)
+
+
+def start_webhook_server() -> Optional[ThreadingHTTPServer]:
+    """Start the FAL webhook receiver in a daemon thread when VIDEO_WEBHOOK_PUBLIC_URL is set."""
+    settings = get_settings()
+    if not settings.webhook_public_url:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", settings.webhook_port), _WebhookHandler)
+    threading.Thread(target=server.serve_forever, name="fal-webhook", daemon=True).start()
+    print(f"[jobs] webhook receiver listening on :{settings.webhook_port} -> {settings.webhook_public_url}", flush=True)
+    return server
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from config import get_settings
+
+
+def hash_key(*parts: Any) -> str:
+    """Stable sha256 over JSON-serializable parts (dict keys are sorted)."""
+
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class KVStore:
+    """JSON values in a SQLite table with per-entry expiry.
+
+    The database file can live on a shared volume so several agent replicas
+    see the same entries.
+    """
+
+    def __init__(self, path: str | Path, table: str):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = Path(path)
+        self.table = table
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._connect() as db:
+            row = db.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < time.time():
+                db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl_sec: float) -> None:
+        with self._connect() as db:
+            db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), time.time() + ttl_sec),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as db:
+            db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        with self._connect() as db:
+            cur = db.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time(),))
+            return cur.rowcount
+
+
+_STORES: dict[str, KVStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(table: str) -> KVStore:
+    """Return the process-wide store for `table` in the `VIDEO_STATE_DB` database."""
+
+    with _STORES_LOCK:
+        store = _STORES.get(table)
+        if store is None:
+            store = KVStore(get_settings().state_db, table)
+            store.purge_expired()
+            _STORES[table] = store
+        return store
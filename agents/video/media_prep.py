@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import multiprocessing
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Optional
+
+try:
+    from PIL import Image, ImageOps
+except Exception:  # Pillow is optional; images are then uploaded untouched
+    Image = None
+    ImageOps = None
+
+from config import get_settings
+
+# Short side of the frame the fabric model renders at
+RESOLUTION_SHORT_SIDE = {"480p": 480, "720p": 720}
+# Silence below this level at either end of a narration clip is trimmed
+SILENCE_THRESHOLD_DB = -50
+SILENCE_KEEP_SEC = 0.05
+
+
+@dataclass
+class PrepReport:
+    """Bytes saved by preprocessing for one job; safe to update from several threads."""
+
+    image_bytes_in: int = 0
+    image_bytes_out: int = 0
+    audio_bytes_in: int = 0
+    audio_bytes_out: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_image(self, before: int, after: int) -> None:
+        with self._lock:
+            self.image_bytes_in += before
+            self.image_bytes_out += after
+
+    def add_audio(self, before: int, after: int) -> None:
+        with self._lock:
+            self.audio_bytes_in += before
+            self.audio_bytes_out += after
+
+    def summary(self) -> str:
+        return (
+            f"bytes_saved: images={self.image_bytes_in - self.image_bytes_out}"
+            f" ({self.image_bytes_in}->{self.image_bytes_out}),"
+            f" audio={self.audio_bytes_in - self.audio_bytes_out}"
+            f" ({self.audio_bytes_in}->{self.audio_bytes_out})"
+        )
+
+
+def normalize_image(data: bytes, resolution: str, quality: int = 88) -> tuple[bytes, str]:
+    """Downscale to the model's resolution, drop metadata and recompress.
+
+    The short side is capped at the resolution's height and the long side at
+    16:9 of it; images are never upscaled. Images with transparency stay PNG,
+    everything else becomes JPEG. Returns `(data, content_type)`.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is not installed")
+    short = RESOLUTION_SHORT_SIDE.get(resolution, 720)
+    long = short * 16 // 9
+
+    with Image.open(BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        w, h = img.size
+        scale = min(1.0, short / min(w, h), long / max(w, h))
+        if scale < 1.0:
+            img = img.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.LANCZOS)
+
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        out = BytesIO()
+        # Saving without exif/icc/info drops all metadata
+        if has_alpha:
+            img.convert("RGBA").save(out, format="PNG", optimize=True)
+            return out.getvalue(), "image/png"
+        img.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return out.getvalue(), "image/jpeg"
+
+
+def trim_silence(data: bytes, output_format: str) -> bytes:
+    """Trim leading/trailing silence from an MP3 clip with ffmpeg; no-op without ffmpeg."""
+    if not (output_format or "").lower().startswith("mp3") or not shutil.which("ffmpeg"):
+        return data
+    # e.g. mp3_44100_128 -> 128k
+    bitrate = output_format.split("_")[-1] if output_format.count("_") == 2 else "128"
+    trim = (
+        f"silenceremove=start_periods=1:start_silence={SILENCE_KEEP_SEC}"
+        f":start_threshold={SILENCE_THRESHOLD_DB}dB"
+    )
+    proc = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "mp3", "-i", "pipe:0",
+            "-af", f"{trim},areverse,{trim},areverse",
+            "-map_metadata", "-1", "-c:a", "libmp3lame", "-b:a", f"{bitrate}k",
+            "-f", "mp3", "pipe:1",
+        ],
+        input=data,
+        capture_output=True,
+        timeout=120,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.decode(errors='replace')[:500]}")
+    return proc.stdout
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(
+                max_workers=get_settings().prep_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def prepare_image(data: bytes, resolution: str, report: Optional[PrepReport] = None) -> tuple[bytes, Optional[str]]:
+    """Run `normalize_image` in the process pool; falls back to the original bytes.
+
+    Returns `(data, content_type)`; content_type is None when the input is
+    returned unchanged.
+    """
+    if Image is None or not get_settings().preprocess_media:
+        return data, None
+    try:
+        out, content_type = _get_pool().submit(normalize_image, data, resolution).result()
+    except Exception as e:
+        print(f"[media_prep] image normalization failed, uploading original: {e}", flush=True)
+        return data, None
+    if len(out) >= len(data):
+        out, content_type = data, None
+    if report is not None:
+        report.add_image(len(data), len(out))
+    print(f"[media_prep] image {len(data)} -> {len(out)} bytes ({resolution})", flush=True)
+    return out, content_type
+
+
+def prepare_audio(data: bytes, output_format: str, report: Optional[PrepReport] = None) -> bytes:
+    """Run `trim_silence` in the process pool; falls back to the original bytes."""
+    if not get_settings().preprocess_media:
+        return data
+    try:
+        out = _get_pool().submit(trim_silence, data, output_format).result()
+    except Exception as e:
+        print(f"[media_prep] silence trim failed, uploading original: {e}", flush=True)
+        return data
+    # The lossy re-encode can come out larger than the original; keep the original then
+    if len(out) >= len(data):
+        out = data
+    if report is not None:
+        report.add_audio(len(data), len(out))
+    print(f"[media_prep] audio {len(data)} -> {len(out)} bytes", flush=True)
+    return out
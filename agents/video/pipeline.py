@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class Stage:
+    """A named unit of work; `fn` receives the results of `deps` as keyword arguments."""
+
+    name: str
+    fn: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+
+
+class StageFailed(RuntimeError):
+    def __init__(self, stage: str, error: BaseException, timings: dict[str, float]):
+        super().__init__(f"stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+        self.timings = timings
+
+
+def run_stages(stages: list[Stage], max_workers: Optional[int] = None) -> tuple[dict[str, Any], dict[str, float]]:
+    """Run `stages` as a dependency graph, starting each stage as soon as its deps finish.
+
+    Returns `(results, timings)` keyed by stage name, with timings in seconds.
+    Raises `StageFailed` for the first stage that errors; stages that have not
+    started yet are skipped.
+    """
+
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{s.name}' depends on unknown stage(s): {missing}")
+
+    results: dict[str, Any] = {}
+    timings: dict[str, float] = {}
+    pending = list(stages)
+    running: dict[Future, str] = {}
+
+    def timed(stage: Stage, kwargs: dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return stage.fn(**kwargs)
+        finally:
+            timings[stage.name] = round(time.perf_counter() - started, 3)
+
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1)
+    try:
+        while pending or running:
+            ready = [s for s in pending if all(d in results for d in s.deps)]
+            for s in ready:
+                pending.remove(s)
+                kwargs = {d: results[d] for d in s.deps}
+                running[pool.submit(timed, s, kwargs)] = s.name
+
+            if not running:
+                raise ValueError(f"Unsatisfiable stage graph: {[s.name for s in pending]}")
+
+            done, _ = wait(list(running), return_when=FIRST_EXCEPTION)
+            for fut in done:
+                name = running.pop(fut)
+                err = fut.exception()
+                if err is not None:
+                    for other in running:
+                        other.cancel()
+                    raise StageFailed(name, err, dict(timings))
+                results[name] = fut.result()
+    finally:
+        # Don't wait for sibling stages still running after a failure; report it now
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return results, timings
+
+
+def format_timings(timings: dict[str, float]) -> str:
+    return ", ".join(f"{name}={secs:.2f}s" for name, secs in timings.items())
+
+
+class ResourceScheduler:
+    """Runs work on one bounded thread pool per backend (e.g. "fal", "elevenlabs").
+
+    `submit` chains work on dependency futures without blocking a worker while
+    they are pending, and `shared` memoizes a future by key so intermediates
+    used by several jobs are only computed once.
+    """
+
+    def __init__(self, limits: dict[str, int]):
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=max(1, n), thread_name_prefix=f"sched-{name}")
+            for name, n in limits.items()
+        }
+        self._shared: dict[Any, Future] = {}
+        self._shared_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def submit(self, resource: str, fn: Callable[..., Any], *deps: Future) -> Future:
+        """Run `fn(*dep_results)` on `resource`'s pool once every dep has succeeded."""
+        pool = self._pools[resource]
+        out: Future = Future()
+        remaining = [len(deps)]
+
+        def relay(inner: Future) -> None:
+            err = inner.exception()
+            if err is not None:
+                out.set_exception(err)
+            else:
+                out.set_result(inner.result())
+
+        def launch() -> None:
+            for dep in deps:
+                err = dep.exception()
+                if err is not None:
+                    out.set_exception(err)
+                    return
+            try:
+                pool.submit(fn, *[d.result() for d in deps]).add_done_callback(relay)
+            except RuntimeError as e:  # pool already shut down
+                out.set_exception(e)
+
+        def on_dep_done(_: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                launch()
+
+        if not deps:
+            launch()
+        for dep in deps:
+            dep.add_done_callback(on_dep_done)
+        return out
+
+    def shared(self, key: Any, resource: str, fn: Callable[..., Any], *deps: Future) -> Future:
+        with self._shared_lock:
+            fut = self._shared.get(key)
+            if fut is None:
+                fut = self._shared[key] = self.submit(resource, fn, *deps)
+            return fut
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Optional, Literal
+import threading
+import time
+from concurrent.futures import Future, as_completed
+from typing import Any, Callable, Optional, Literal
 
 from pydantic import BaseModel, Field
 from langchain_core.tools import StructuredTool
 
 from config import get_settings, ensure_env_for_fal
-from elevenlabs_client import synthesize_speech_to_file, ElevenLabsError
+from coral_runtime import PROGRESS_PREFIX
+from elevenlabs_client import synthesize_long_speech, audio_content_type, resolve_voice_id, ElevenLabsError
 from fal_runner import (
-    upload_file_to_fal,
+    upload_bytes_to_fal,
     run_fabric,
     get_hardcoded_image_url,
     run_product_holding,
+    run_product_holding_async,
+    run_fabric_async,
 )
+from jobs import get_job_registry
+from media_prep import RESOLUTION_SHORT_SIDE, PrepReport, prepare_audio
+from pipeline import ResourceScheduler, Stage, StageFailed, format_timings, run_stages
+from results import ToolResult, get_artifact_tool
+from tts_cache import TTSCache, get_tts_cache
 
 
 class GenerateVideoArgs(BaseModel):
@@ -34,6 +46,122 @@ class GenerateVideoArgs(BaseModel):
     )
 
 
+TTS_OUTPUT_FORMAT = "mp3_44100_128"
+TTS_MODEL_ID = "eleven_multilingual_v2"
+
+
+class _CompositeMissing(RuntimeError):
+    def __init__(self, result: dict):
+        super().__init__("product holding returned no image url")
+        self.result = result
+
+
+# Use product holding model to composite person + product images
+def _composite(
+    person_image_url: str,
+    product_image_url: str,
+    resolution: str,
+    report: Optional[PrepReport] = None,
+) -> str:
+    print("[video.generate_video] invoking product holding to composite images...", flush=True)
+    holding_result = run_product_holding(
+        person_image_url=person_image_url,
+        product_image_url=product_image_url,
+        wait=True,
+        resolution=resolution,
+        report=report,
+    )
+    final_image_url = holding_result.get("image_url") or holding_result.get("source_image_url")
+    if not final_image_url:
+        print(f"[video.generate_video] product holding returned no image url. raw keys={list((holding_result or {}).keys())}", flush=True)
+        raise _CompositeMissing(holding_result)
+    print(f"[video.generate_video] product holding produced final_image_url={final_image_url}", flush=True)
+    return final_image_url
+
+
+# Bounds ElevenLabs requests across every tool call and batch in this process
+_ELEVENLABS_SLOTS: Optional[threading.BoundedSemaphore] = None
+_ELEVENLABS_SLOTS_LOCK = threading.Lock()
+
+
+def _elevenlabs_slots() -> threading.BoundedSemaphore:
+    global _ELEVENLABS_SLOTS
+    with _ELEVENLABS_SLOTS_LOCK:
+        if _ELEVENLABS_SLOTS is None:
+            _ELEVENLABS_SLOTS = threading.BoundedSemaphore(max(1, get_settings().elevenlabs_concurrency))
+        return _ELEVENLABS_SLOTS
+
+
+# ElevenLabs only (no fallback)
+def _synthesize(text: str, voice: str, api_key: str) -> dict:
+    tts_cache = get_tts_cache()
+    key = TTSCache.key_for(text, voice, TTS_MODEL_ID, TTS_OUTPUT_FORMAT)
+    hit = tts_cache.get(key) if tts_cache else None
+    if hit and hit.fal_url:
+        print(f"[video.generate_video] TTS cache hit with uploaded url={hit.fal_url}", flush=True)
+        return {"key": key, "data": None, "url": hit.fal_url}
+    print("[video.generate_video] synthesizing audio via ElevenLabs...", flush=True)
+    settings = get_settings()
+    audio = synthesize_long_speech(
+        text=text,
+        api_key=api_key,
+        voice_id=voice,
+        output_format=TTS_OUTPUT_FORMAT,
+        model_id=TTS_MODEL_ID,
+        cache=tts_cache,
+        max_chars=settings.tts_chunk_chars,
+        concurrency=settings.elevenlabs_concurrency,
+        slots=_elevenlabs_slots(),
+    )
+    print(f"[video.generate_video] audio bytes={len(audio)}", flush=True)
+    return {"key": key, "data": audio, "url": None}
+
+
+def _upload_narration(clip: dict, report: Optional[PrepReport] = None) -> str:
+    if clip["url"]:
+        return clip["url"]
+    audio = prepare_audio(clip["data"], TTS_OUTPUT_FORMAT, report)
+    print("[video.generate_video] uploading audio to FAL storage...", flush=True)
+    audio_url = upload_bytes_to_fal(audio, audio_content_type(TTS_OUTPUT_FORMAT), file_name="narration.mp3")
+    tts_cache = get_tts_cache()
+    if tts_cache:
+        tts_cache.set_url(clip["key"], audio_url)
+    print(f"[video.generate_video] audio_url={audio_url}", flush=True)
+    return audio_url
+
+
+def _render(image_url: str, audio_url: str, resolution: str, wait: bool) -> dict:
+    print("[video.generate_video] submitting veed/fabric-1.0 job...", flush=True)
+    return run_fabric(
+        image_url=image_url,
+        audio_url=audio_url,
+        resolution=resolution,
+        wait=wait,
+    )
+
+
+def _stage_error_message(stage: str, e: BaseException) -> str:
+    if isinstance(e, _CompositeMissing):
+        return "Product holding failed to composite images (no image in result)"
+    if stage == "composite":
+        return f"Failed to composite person and product images: {e}"
+    if isinstance(e, ElevenLabsError):
+        return (
+            "ElevenLabs TTS failed. Ensure the key has text_to_speech permission and the voice is accessible. "
+            f"Detail: {e}"
+        )
+    if stage == "fabric":
+        return f"FAL video job failed: {e}"
+    return f"{stage} failed: {e}"
+
+
+def _stage_error(stage: str, e: BaseException) -> str:
+    result = ToolResult.error(_stage_error_message(stage, e), stage=stage)
+    if isinstance(e, _CompositeMissing):
+        result.attach("composite_result", e.result)
+    return result.render()
+
+
 def _generate_video_impl(
     text: str,
     person_image_url: str,
@@ -51,86 +179,445 @@ def _generate_video_impl(
     )
     
     print(f"[video.generate_video] person_image_url={person_image_url}, product_image_url={product_image_url}", flush=True)
-    
-    # Use product holding model to composite person + product images
-    try:
-        print("[video.generate_video] invoking product holding to composite images...", flush=True)
-        holding_result = run_product_holding(
-            person_image_url=person_image_url,
-            product_image_url=product_image_url,
-            wait=True,
-        )
-        final_image_url = holding_result.get("image_url") or holding_result.get("source_image_url")
-        if not final_image_url:
-            print(f"[video.generate_video] product holding returned no image url. raw keys={list((holding_result or {}).keys())}", flush=True)
-            return f"ERROR: Product holding failed to composite images. Result: {holding_result}"
-        print(f"[video.generate_video] product holding produced final_image_url={final_image_url}", flush=True)
-    except Exception as e:
-        print(f"[video.generate_video] product holding invocation failed: {e}", flush=True)
-        return f"ERROR: Failed to composite person and product images: {e}"
 
     if not settings.elevenlabs_api_key:
-        return "ERROR: ELEVENLABS_API_KEY is not set"
+        return ToolResult.error("ELEVENLABS_API_KEY is not set").render()
 
-    # ElevenLabs only (no fallback)
-    try:
-        print("[video.generate_video] synthesizing audio via ElevenLabs...", flush=True)
-        audio_path = synthesize_speech_to_file(
-            text=text,
-            api_key=settings.elevenlabs_api_key,
-            voice_id=voice_id or settings.elevenlabs_voice_id,
-            output_format="mp3_44100_128",
-        )
-        print(f"[video.generate_video] audio_path={audio_path}", flush=True)
-    except ElevenLabsError as e:
-        print(f"[video.generate_video] ElevenLabs failed: {e}", flush=True)
-        return (
-            "ERROR: ElevenLabs TTS failed. Ensure the key has text_to_speech permission and the voice is accessible. "
-            f"Detail: {e}"
-        )
+    voice = resolve_voice_id(voice_id or settings.elevenlabs_voice_id)
 
-    print("[video.generate_video] uploading audio to FAL storage...", flush=True)
-    audio_url = upload_file_to_fal(str(audio_path))
-    print(f"[video.generate_video] audio_url={audio_url}", flush=True)
+    report = PrepReport()
 
-    print("[video.generate_video] submitting veed/fabric-1.0 job...", flush=True)
+    # composite and tts -> audio_upload run concurrently and join at fabric
+    started = time.perf_counter()
     try:
-        result = run_fabric(
-            image_url=final_image_url,
-            audio_url=audio_url,
-            resolution=resolution,
-            wait=wait,
-        )
-    except Exception as e:
-        print(f"[video.generate_video] FAL job submission failed: {e}", flush=True)
-        return f"ERROR: FAL video job failed: {e}"
+        results, timings = run_stages([
+            Stage("composite", lambda: _composite(person_image_url, product_image_url, resolution, report)),
+            Stage("tts", lambda: _synthesize(text, voice, settings.elevenlabs_api_key)),
+            Stage("audio_upload", lambda tts: _upload_narration(tts, report), deps=("tts",)),
+            Stage(
+                "fabric",
+                lambda composite, audio_upload: _render(composite, audio_upload, resolution, wait),
+                deps=("composite", "audio_upload"),
+            ),
+        ])
+    except StageFailed as sf:
+        print(f"[video.generate_video] {sf} (timings: {format_timings(sf.timings)})", flush=True)
+        return _stage_error(sf.stage, sf.error)
+
+    timings["total"] = round(time.perf_counter() - started, 3)
+    return _format_video_result(results["fabric"], wait, timings, report)
+
+
+def _format_video_result(result: Any, wait: bool, timings: dict[str, float], report: PrepReport) -> str:
+    timing_line = f"timings: {format_timings(timings)}\n{report.summary()}"
     print(f"[video.generate_video] fal_result keys={list((result or {}).keys())}", flush=True)
+    print(f"[video.generate_video] {timing_line}", flush=True)
+    fields = {
+        "timings": format_timings(timings),
+        "bytes_saved": report.summary().removeprefix("bytes_saved: "),
+    }
 
     if wait:
         video = (result or {}).get("video", {})
         url = video.get("url")
         if url:
             print(f"[video.generate_video] success video_url={url}", flush=True)
-            return url
+            return ToolResult("ok", "video ready", {"video_url": url, **fields}).render()
         print(f"[video.generate_video] no video url in result: {result}", flush=True)
-        return f"No video URL returned. Full result: {result}"
+        return ToolResult.error("no video URL returned", **fields).attach("fal_result", result).render()
     else:
         rid = result.get('request_id') if isinstance(result, dict) else None
         print(f"[video.generate_video] submitted request_id={rid}", flush=True)
-        return f"request_id={rid}"
+        return ToolResult(
+            "pending", "render submitted; poll with get_video_job_status", {"request_id": rid, **fields}
+        ).render()
+
+
+def _log_progress(request_id: str, event: Any) -> None:
+    position = getattr(event, "position", None)
+    if position is not None:
+        print(f"[video.generate_video] {request_id} queued at position {position}", flush=True)
+
+
+def _first_stage_failure(group: BaseExceptionGroup) -> Optional[StageFailed]:
+    for e in group.exceptions:
+        if isinstance(e, StageFailed):
+            return e
+        if isinstance(e, BaseExceptionGroup):
+            found = _first_stage_failure(e)
+            if found:
+                return found
+    return None
+
+
+async def _generate_video_async_impl(
+    text: str,
+    person_image_url: str,
+    product_image_url: str,
+    resolution: str = "480p",
+    voice_id: Optional[str] = None,
+    wait: bool = True,
+) -> str:
+    """Event-loop version of `_generate_video_impl`.
+
+    FAL work is awaited through the async queue client, so many renders can
+    share one loop; blocking ElevenLabs/upload calls run in worker threads.
+    Cancelling the task, or exceeding VIDEO_RENDER_DEADLINE_SEC, cancels the
+    FAL requests in flight.
+    """
+    settings = get_settings()
+    ensure_env_for_fal(settings)
+    print(f"[video.generate_video] (async) person_image_url={person_image_url}, product_image_url={product_image_url}", flush=True)
+
+    if not settings.elevenlabs_api_key:
+        return ToolResult.error("ELEVENLABS_API_KEY is not set").render()
+
+    voice = resolve_voice_id(voice_id or settings.elevenlabs_voice_id)
+    timings: dict[str, float] = {}
+    report = PrepReport()
+
+    async def timed(stage: str, awaitable: Any) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception as e:
+            raise StageFailed(stage, e, dict(timings)) from e
+        finally:
+            timings[stage] = round(time.perf_counter() - t0, 3)
+
+    async def composite() -> str:
+        holding_result = await run_product_holding_async(
+            person_image_url=person_image_url,
+            product_image_url=product_image_url,
+            on_progress=_log_progress,
+            resolution=resolution,
+            report=report,
+        )
+        final_image_url = holding_result.get("image_url") or holding_result.get("source_image_url")
+        if not final_image_url:
+            raise _CompositeMissing(holding_result)
+        return final_image_url
+
+    async def narration() -> str:
+        clip = await timed("tts", asyncio.to_thread(_synthesize, text, voice, settings.elevenlabs_api_key))
+        return await timed("audio_upload", asyncio.to_thread(_upload_narration, clip, report))
+
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.render_deadline_sec or None):
+            # composite and tts -> audio_upload run concurrently and join at fabric
+            async with asyncio.TaskGroup() as tg:
+                image_task = tg.create_task(timed("composite", composite()))
+                audio_task = tg.create_task(narration())
+            if wait:
+                result = await timed(
+                    "fabric",
+                    run_fabric_async(image_task.result(), audio_task.result(), resolution, on_progress=_log_progress),
+                )
+            else:
+                result = await timed(
+                    "fabric",
+                    asyncio.to_thread(_render, image_task.result(), audio_task.result(), resolution, False),
+                )
+    except TimeoutError:
+        return ToolResult.error(
+            f"video generation exceeded VIDEO_RENDER_DEADLINE_SEC={settings.render_deadline_sec:g}s",
+            timings=format_timings(timings),
+        ).render()
+    except (StageFailed, ExceptionGroup) as e:
+        sf = e if isinstance(e, StageFailed) else _first_stage_failure(e)
+        if sf is None:
+            raise
+        print(f"[video.generate_video] {sf} (timings: {format_timings(sf.timings)})", flush=True)
+        return _stage_error(sf.stage, sf.error)
+
+    timings["total"] = round(time.perf_counter() - started, 3)
+    return _format_video_result(result, wait, timings, report)
+
+
+class GenerateVideoBatchArgs(BaseModel):
+    scripts: list[str] = Field(..., min_length=1, description="Narration scripts; each is synthesized once")
+    person_image_urls: list[str] = Field(..., min_length=1, description="Spokesperson image URLs")
+    product_image_urls: list[str] = Field(..., min_length=1, description="Product image URLs")
+    resolutions: list[Literal["480p", "720p"]] = Field(
+        default_factory=lambda: ["480p"],
+        description="Resolutions to render each combination at",
+    )
+    voice_id: Optional[str] = Field(
+        default=None,
+        description="Optional ElevenLabs voice ID (overrides env)",
+    )
+    wait: bool = Field(
+        default=True,
+        description="If true, wait for each video; otherwise return one request_id per item",
+    )
+    thread_id: Optional[str] = Field(
+        default=None,
+        description="Coral threadId to post each video's result to as soon as it finishes",
+    )
+    mentions: Optional[list[str]] = Field(
+        default=None,
+        description="Agent IDs to mention in those per-video messages (e.g. the senderId)",
+    )
+
+
+# Coral send_message tool and the loop it runs on, set in main(); lets the batch post progress
+_CORAL_SEND_MESSAGE = None
+_CORAL_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def set_coral_send_message(send_message: Any) -> None:
+    global _CORAL_SEND_MESSAGE, _CORAL_LOOP
+    _CORAL_SEND_MESSAGE = send_message
+    _CORAL_LOOP = asyncio.get_running_loop()
+
+
+def _post_to_thread(thread_id: str, mentions: Optional[list[str]], content: str) -> None:
+    """Post to a Coral thread from a worker thread (the batch runs off the event loop)."""
+    if _CORAL_SEND_MESSAGE is None or _CORAL_LOOP is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(
+            _CORAL_SEND_MESSAGE.ainvoke({"threadId": thread_id, "content": content, "mentions": mentions or []}),
+            _CORAL_LOOP,
+        ).result(timeout=30)
+    except Exception as e:
+        print(f"[video] failed to post progress to thread {thread_id}: {e}", flush=True)
+
+
+def _tagged(stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    def run(*args: Any) -> Any:
+        try:
+            return fn(*args)
+        except Exception as e:
+            raise StageFailed(stage, e, {}) from e
+    return run
+
+
+def _generate_video_batch_impl(
+    scripts: list[str],
+    person_image_urls: list[str],
+    product_image_urls: list[str],
+    resolutions: Optional[list[str]] = None,
+    voice_id: Optional[str] = None,
+    wait: bool = True,
+    on_item: Optional[Callable[[dict, str], None]] = None,
+) -> str:
+    """Render scripts x persons x products x resolutions, sharing composites and narration.
+
+    Items are reported (printed and passed to `on_item` with their result line)
+    as they finish; the returned text lists them in completion order.
+    """
+    settings = get_settings()
+    ensure_env_for_fal(settings)
+    if not settings.elevenlabs_api_key:
+        return ToolResult.error("ELEVENLABS_API_KEY is not set").render()
+
+    resolutions = list(dict.fromkeys(resolutions or ["480p"]))
+    scripts = list(dict.fromkeys(scripts))
+    pairs = list(dict.fromkeys((p, q) for q in product_image_urls for p in person_image_urls))
+    total = len(scripts) * len(pairs) * len(resolutions)
+    if total > settings.batch_max_items:
+        return ToolResult.error(
+            f"batch expands to {total} videos; limit is {settings.batch_max_items} (VIDEO_BATCH_MAX_ITEMS)"
+        ).render()
+
+    voice = resolve_voice_id(voice_id or settings.elevenlabs_voice_id)
+    print(
+        f"[video.generate_video_batch] {len(scripts)} scripts x {len(pairs)} image pairs x {len(resolutions)} resolutions = {total} videos "
+        f"(fal<={settings.fal_concurrency}, elevenlabs<={settings.elevenlabs_concurrency})",
+        flush=True,
+    )
+
+    # one composite per pair serves every resolution, so prepare images for the largest
+    prep_resolution = max(resolutions, key=lambda r: RESOLUTION_SHORT_SIDE.get(r, 0))
+    report = PrepReport()
+    scheduler = ResourceScheduler({
+        "fal": settings.fal_concurrency,
+        "elevenlabs": settings.elevenlabs_concurrency,
+    })
+    started = time.perf_counter()
+    items: dict[Future, dict] = {}
+    try:
+        for si, text in enumerate(scripts):
+            clip = scheduler.shared(
+                ("tts", text), "elevenlabs", _tagged("tts", lambda text=text: _synthesize(text, voice, settings.elevenlabs_api_key))
+            )
+            audio = scheduler.shared(
+                ("audio", text), "fal", _tagged("audio_upload", lambda clip: _upload_narration(clip, report)), clip
+            )
+            for pi, (person, product) in enumerate(pairs):
+                image = scheduler.shared(
+                    ("composite", person, product),
+                    "fal",
+                    _tagged(
+                        "composite",
+                        lambda person=person, product=product: _composite(person, product, prep_resolution, report),
+                    ),
+                )
+                for resolution in resolutions:
+                    render = scheduler.submit(
+                        "fal",
+                        _tagged("fabric", lambda image_url, audio_url, resolution=resolution: _render(image_url, audio_url, resolution, wait)),
+                        image,
+                        audio,
+                    )
+                    items[render] = {
+                        "script": si + 1,
+                        "person_image_url": person,
+                        "product_image_url": product,
+                        "image_pair": pi + 1,
+                        "resolution": resolution,
+                    }
+
+        lines = []
+        finished = []
+        for done, fut in enumerate(as_completed(items), 1):
+            item = dict(items[fut])
+            item["elapsed_sec"] = round(time.perf_counter() - started, 3)
+            err = fut.exception()
+            if err is not None:
+                stage, cause = (err.stage, err.error) if isinstance(err, StageFailed) else ("unknown", err)
+                item["error"] = _stage_error_message(stage, cause)
+            else:
+                result = fut.result() or {}
+                if wait:
+                    item["video_url"] = (result.get("video") or {}).get("url")
+                    if not item["video_url"]:
+                        item["error"] = "No video URL returned"
+                        item["fal_result"] = result
+                else:
+                    item["request_id"] = result.get("request_id")
+            outcome = item.get("video_url") or (f"request_id={item['request_id']}" if item.get("request_id") else item.get("error"))
+            line = (
+                f"[{done}/{total}] script={item['script']} pair={item['image_pair']} {item['resolution']} "
+                f"-> {outcome} ({item['elapsed_sec']:.1f}s)"
+            )
+            print(f"[video.generate_video_batch] {line}", flush=True)
+            lines.append(line)
+            finished.append(item)
+            if on_item is not None:
+                on_item(item, line)
+    finally:
+        scheduler.shutdown(wait=False)
+
+    failed = sum(1 for item in finished if item.get("error"))
+    return (
+        ToolResult(
+            "error" if failed == len(finished) else "ok",
+            f"{len(finished)} videos, {failed} failed (listed in completion order)",
+            {
+                "videos": lines,
+                "timings": f"total={time.perf_counter() - started:.2f}s",
+                "bytes_saved": report.summary().removeprefix("bytes_saved: "),
+            },
+        )
+        .attach("items", finished)
+        .render()
+    )
+
+
+def _generate_video_batch_tool(
+    scripts: list[str],
+    person_image_urls: list[str],
+    product_image_urls: list[str],
+    resolutions: Optional[list[str]] = None,
+    voice_id: Optional[str] = None,
+    wait: bool = True,
+    thread_id: Optional[str] = None,
+    mentions: Optional[list[str]] = None,
+) -> str:
+    on_item = None
+    if thread_id:
+        on_item = lambda item, line: _post_to_thread(thread_id, mentions, f"{PROGRESS_PREFIX}Video {line}")
+    return _generate_video_batch_impl(
+        scripts, person_image_urls, product_image_urls, resolutions, voice_id, wait, on_item=on_item
+    )
+
+
+class VideoJobArgs(BaseModel):
+    job_id: str = Field(..., description="request_id returned by generate_video with wait=false")
+
+
+def _job_result(job: dict) -> ToolResult:
+    status = {"completed": "ok", "failed": "error", "cancelled": "error"}.get(job["status"], "pending")
+    fields = {k: job.get(k) for k in ("job_id", "kind", "status", "output_url", "error")}
+    return ToolResult(status, f"{job['kind']} job {job['status']}", fields)
+
+
+def _video_job_status_impl(job_id: str) -> str:
+    ensure_env_for_fal(get_settings())
+    job = get_job_registry().refresh(job_id)
+    if job is None:
+        return ToolResult.error(f"unknown job_id {job_id}").render()
+    return _job_result(job).render()
+
+
+def _video_job_result_impl(job_id: str) -> str:
+    ensure_env_for_fal(get_settings())
+    job = get_job_registry().refresh(job_id)
+    if job is None:
+        return ToolResult.error(f"unknown job_id {job_id}").render()
+    result = _job_result(job)
+    if job["status"] == "completed" and not job.get("output_url"):
+        result.status, result.summary = "error", "job completed without an output URL"
+    return result.attach("fal_result", job.get("result")).render()
+
+
+def _cancel_video_job_impl(job_id: str) -> str:
+    ensure_env_for_fal(get_settings())
+    try:
+        job = get_job_registry().cancel(job_id)
+    except Exception as e:
+        return ToolResult.error(f"failed to cancel job {job_id}: {e}").render()
+    if job is None:
+        return ToolResult.error(f"unknown job_id {job_id}").render()
+    return _job_result(job).render()
 
 
 def get_video_tools() -> list[StructuredTool]:
     tool = StructuredTool.from_function(
         func=_generate_video_impl,
+        coroutine=_generate_video_async_impl,
         name="generate_video",
         description=(
             "Generate a narrated video from text using two required images (person and product). "
             "The agent composites the person holding the product via FAL's product-holding model, "
             "narrates with ElevenLabs TTS, and creates the final video through FAL veed/fabric-1.0. "
-            "Required: text, person_image_url, product_image_url. Optional: resolution (480p|720p), voice_id, wait (bool)."
+            "Required: text, person_image_url, product_image_url. Optional: resolution (480p|720p), voice_id, wait (bool). "
+            "The result is a compact status line plus fields (video_url or request_id, timings per stage). "
+            "With wait=false the render continues in the background; track it with get_video_job_status."
         ),
         args_schema=GenerateVideoArgs,
         return_direct=False,
     )
-    return [tool]
+    status_tool = StructuredTool.from_function(
+        func=_video_job_status_impl,
+        name="get_video_job_status",
+        description="Get the status (queued|in_progress|completed|failed|cancelled) and output URL of a wait=false video job.",
+        args_schema=VideoJobArgs,
+    )
+    result_tool = StructuredTool.from_function(
+        func=_video_job_result_impl,
+        name="get_video_job_result",
+        description="Return the final video/image URL of a completed wait=false job.",
+        args_schema=VideoJobArgs,
+    )
+    cancel_tool = StructuredTool.from_function(
+        func=_cancel_video_job_impl,
+        name="cancel_video_job",
+        description="Cancel a queued or running wait=false video job.",
+        args_schema=VideoJobArgs,
+    )
+    batch_tool = StructuredTool.from_function(
+        func=_generate_video_batch_tool,
+        name="generate_video_batch",
+        description=(
+            "Generate many videos at once: every script x person image x product image x resolution. "
+            "Each script is narrated once and each person/product pair is composited once, then reused. "
+            "Work runs with bounded FAL/ElevenLabs concurrency; one result line per video, in the order they finished. "
+            "Pass thread_id and mentions to have each video posted to the thread as soon as it finishes."
+        ),
+        args_schema=GenerateVideoBatchArgs,
+    )
+    return [tool, batch_tool, status_tool, result_tool, cancel_tool, get_artifact_tool()]
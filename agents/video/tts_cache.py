@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from config import get_settings
+
+
+@dataclass
+class CachedClip:
+    key: str
+    path: Path
+    size: int
+    fal_url: Optional[str]
+
+
+class TTSCache:
+    """Content-addressed on-disk cache of synthesized audio clips.
+
+    Clips live in `root` as `<key><suffix>`; a small SQLite index tracks size,
+    last access (for LRU eviction once `max_bytes` is exceeded) and the FAL
+    storage URL the clip was last uploaded to.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int, url_ttl_sec: float):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.url_ttl_sec = url_ttl_sec
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._db_path = self.root / "index.sqlite3"
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS clips ("
+                " key TEXT PRIMARY KEY, file TEXT NOT NULL, size INTEGER NOT NULL,"
+                " fal_url TEXT, fal_url_at REAL, last_used REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def key_for(text: str, voice_id: str, model_id: str, output_format: str) -> str:
+        blob = json.dumps([text, voice_id, model_id, output_format], ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self._db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key: str) -> Optional[CachedClip]:
+        with self._lock, self._connect() as db:
+            row = db.execute(
+                "SELECT file, size, fal_url, fal_url_at FROM clips WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            file, size, fal_url, fal_url_at = row
+            path = self.root / file
+            if not path.exists():
+                db.execute("DELETE FROM clips WHERE key = ?", (key,))
+                return None
+            if fal_url and (fal_url_at or 0) + self.url_ttl_sec < time.time():
+                fal_url = None
+            db.execute("UPDATE clips SET last_used = ? WHERE key = ?", (time.time(), key))
+        return CachedClip(key=key, path=path, size=size, fal_url=fal_url)
+
+    def put(self, key: str, data: bytes, suffix: str) -> CachedClip:
+        file = f"{key}{suffix}"
+        path = self.root / file
+        tmp = path.with_name(f".{file}.{os.getpid()}.{threading.get_ident()}.part")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO clips (key, file, size, fal_url, fal_url_at, last_used)"
+                " VALUES (?, ?, ?, NULL, NULL, ?)",
+                (key, file, len(data), time.time()),
+            )
+            self._evict(db, keep=key)
+        return CachedClip(key=key, path=path, size=len(data), fal_url=None)
+
+    def set_url(self, key: str, fal_url: str) -> None:
+        with self._lock, self._connect() as db:
+            db.execute(
+                "UPDATE clips SET fal_url = ?, fal_url_at = ? WHERE key = ?",
+                (fal_url, time.time(), key),
+            )
+
+    def _evict(self, db: sqlite3.Connection, keep: str) -> None:
+        (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = db.execute(
+            "SELECT key, file, size FROM clips WHERE key != ? ORDER BY last_used ASC", (keep,)
+        ).fetchall()
+        for key, file, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                (self.root / file).unlink(missing_ok=True)
+            except OSError:
+                continue
+            db.execute("DELETE FROM clips WHERE key = ?", (key,))
+            total -= size
+            print(f"[tts_cache] evicted {key[:12]} ({size} bytes)", flush=True)
+
+
+_CACHE: Optional[TTSCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """Return the process-wide TTS cache, or None when disabled (`TTS_CACHE_MAX_MB=0`)."""
+
+    global _CACHE
+    settings = get_settings()
+    if settings.tts_cache_max_bytes <= 0:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = TTSCache(
+                Path(settings.cache_dir) / "tts",
+                max_bytes=settings.tts_cache_max_bytes,
+                url_ttl_sec=settings.fal_url_ttl_sec,
+            )
+        return _CACHE